@@ -0,0 +1,72 @@
+# benchmarks/bench_code_index.py
+"""Library-wide QR/barcode indexing throughput and incremental rescans.
+
+Usage: python benchmarks/bench_code_index.py [--images 200] [--workers 1 4]
+Builds a temporary library of 1080p screenshots, some with a QR code from
+benchmarks/qr_samples pasted in, and indexes it with code_index.CodeIndexer:
+a full scan per worker count, a rescan with nothing changed, and a rescan
+after touching 10% of the files. Needs pyzbar and the zbar shared library.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+import qr_scan
+from code_index import CodeIndexer
+from library import diff_snapshots, scan_directory
+from library_index import LibraryIndex
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qr_samples")
+CODE_EVERY = 5  # one screenshot in five shows a QR code
+
+
+def make_library(directory, count):
+    codes = [Image.open(os.path.join(SAMPLES, name)).convert("RGB") for name in sorted(os.listdir(SAMPLES)) if name.endswith("_clean.png")]
+    base = Image.new("RGB", (1920, 1080), "#1E1E1E")
+    draw = ImageDraw.Draw(base)
+    for y in range(8, 1080, 18): draw.text((40 + (y // 18 % 5) * 16, y), "def render(self, box, resample): return level.resize(size)", fill="#D4D4D4")
+    for i in range(count):
+        image = base.copy()
+        ImageDraw.Draw(image).text((1500, 20), f"frame {i}", fill="#FFFFFF")
+        if i % CODE_EVERY == 0: image.paste(codes[i // CODE_EVERY % len(codes)], (1200 + i % 300, 300 + i % 200))
+        image.save(os.path.join(directory, f"screenshot_{i:05d}.png"), compress_level=1)
+
+
+def run(index, workers, label):
+    stats = CodeIndexer(index, workers=workers).run()
+    print(f"{label:<22}{workers:>8}{stats.scanned:>9}{stats.with_codes:>7}{stats.unchanged:>11}{stats.seconds:>9.2f}{stats.rate:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, max(1, (os.cpu_count() or 2) - 1)])
+    args = parser.parse_args()
+    if qr_scan.zbar_decode is None: sys.exit("pyzbar / zbar library not available")
+
+    print(f"{'run':<22}{'workers':>8}{'scanned':>9}{'codes':>7}{'unchanged':>11}{'seconds':>9}{'img/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        make_library(directory, args.images)
+        for workers in dict.fromkeys(args.workers):
+            index = LibraryIndex(directory); index.reset_codes()  # every worker count starts from scratch
+            index.apply(diff_snapshots(index.entries(), scan_directory(directory)))
+            run(index, workers, "full scan")
+            index.close()
+        index = LibraryIndex(directory)
+        run(index, args.workers[-1], "nothing changed")
+        for name in sorted(n for n in os.listdir(directory) if n.endswith(".png"))[:args.images // 10]:
+            path = os.path.join(directory, name); st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        index.apply(diff_snapshots(index.entries(), scan_directory(directory)))
+        run(index, args.workers[-1], "10% touched")
+        print(f"search 'catbox': {len(index.search_codes('catbox'))} screenshots")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_decode.py
+"""Per-image thumbnail decode time and peak memory: old path vs thumbnails.decode_reduced.
+
+Usage: python benchmarks/bench_decode.py [--repeat 5]
+Each case runs in a fresh process so peak RSS is not polluted by earlier cases.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from thumbnails import decode_reduced, THUMBNAIL_SIZE
+
+SIZES = {"1080p": (1920, 1080), "4K": (3840, 2160), "3x4K": (11520, 2160)}
+FORMATS = {"PNG": ".png", "JPEG": ".jpg", "BMP": ".bmp"}
+
+
+def peak_rss_mb():
+    """Peak RSS of this process. VmHWM is preferred on Linux: ru_maxrss survives
+    exec and would report the parent's peak in a freshly spawned worker."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"): return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def old_path(path):
+    with Image.open(path) as img:
+        img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        return img.copy()
+
+
+def new_path(path):
+    return decode_reduced(path, THUMBNAIL_SIZE)
+
+
+def run_case(args):
+    method, path, repeat = args
+    fn = old_path if method == "old" else new_path
+    before = peak_rss_mb()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(path); times.append(time.perf_counter() - t0)
+    return min(times), peak_rss_mb() - before
+
+
+def make_image(path, size, fmt):
+    """Screenshot-like content: flat panels, text rows and a gradient strip"""
+    img = Image.new("RGB", size, "#1E1E1E")
+    draw = ImageDraw.Draw(img)
+    for y in range(0, size[1], 40):
+        draw.rectangle((10, y + 6, size[0] // 4, y + 32), fill="#2D2D2D")
+        draw.text((20, y + 12), "The quick brown fox jumps over the lazy dog", fill="#E0E0E0")
+    for x in range(size[0] // 2, size[0]):
+        draw.line((x, 0, x, size[1] // 3), fill=(x % 256, (x // 3) % 256, 160))
+    img.save(path, fmt, **({"quality": 90} if fmt == "JPEG" else {}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'format':<7}{'size':<7}{'old ms':>9}{'new ms':>9}{'speedup':>9}{'old MB':>9}{'new MB':>9}")
+        for fmt, ext in FORMATS.items():
+            for label, size in SIZES.items():
+                path = os.path.join(directory, f"{label}{ext}")
+                make_image(path, size, fmt)
+                results = {}
+                for method in ("old", "new"):
+                    with ctx.Pool(1, maxtasksperchild=1) as pool:
+                        results[method] = pool.apply(run_case, ((method, path, args.repeat),))
+                (old_t, old_m), (new_t, new_m) = results["old"], results["new"]
+                print(f"{fmt:<7}{label:<7}{old_t * 1000:>9.1f}{new_t * 1000:>9.1f}{old_t / new_t:>8.2f}x{old_m:>9.1f}{new_m:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_edges.py
+"""Edge map build time and snap lookup cost for snap-to-element selection.
+
+Usage: python benchmarks/bench_edges.py [--repeat 3] [--lookups 100000]
+The build runs in the background while the overlay is shown and has to be
+done before the first drag; BUDGET_MS is a fast user's click after the
+overlay appears.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from edges import EdgeMap
+
+SIZES = {"1080p": (1920, 1080), "1440p": (2560, 1440), "4K": (3840, 2160), "5K": (5120, 2880)}  # one monitor: the overlay only grabs the one under the cursor
+BUDGET_MS = 150
+
+
+def desktop(size):
+    """Windows, toolbars, buttons and text: the kind of boundaries snapping is for"""
+    rnd = random.Random(1)
+    img = Image.new("RGB", size, "#2B2B2B")
+    draw = ImageDraw.Draw(img)
+    for _ in range(size[0] * size[1] // 400000):
+        x, y = rnd.randrange(size[0] - 400), rnd.randrange(size[1] - 300)
+        w, h = rnd.randrange(200, 900), rnd.randrange(150, 700)
+        draw.rectangle((x, y, x + w, y + h), fill="#F3F3F3", outline="#999999")
+        draw.rectangle((x, y, x + w, y + 30), fill="#DADADA")
+        for bx in range(x + 10, x + w - 90, 100): draw.rectangle((bx, y + 40, bx + 80, y + 64), fill="#0078D4")
+        for ty in range(y + 80, y + h - 12, 18): draw.text((x + 12, ty), "Lorem ipsum dolor sit amet, consectetur", fill="#222222")
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'size':<7}{'build ms':>10}{'budget':>8}{'x edges':>9}{'y edges':>9}{'snap us':>9}{'snapped':>9}")
+    for label, size in SIZES.items():
+        image = desktop(size)
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter(); edges = EdgeMap.build(image); times.append(time.perf_counter() - t0)
+        build_ms = min(times) * 1000
+        rnd = random.Random(2)
+        points = [(rnd.randrange(size[0]), rnd.randrange(size[1])) for _ in range(args.lookups)]
+        t0 = time.perf_counter()
+        moved = sum(edges.snap(x, y, 8) != (x, y) for x, y in points)
+        per_lookup = (time.perf_counter() - t0) / args.lookups * 1e6
+        print(f"{label:<7}{build_ms:>10.1f}{'ok' if build_ms < BUDGET_MS else 'OVER':>8}{sum(map(len, edges.columns)):>9}"
+              f"{sum(map(len, edges.rows)):>9}{per_lookup:>9.2f}{moved / args.lookups:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_encoders.py
+"""Encode time and output size of every encoder profile on representative screenshots.
+
+Usage: python benchmarks/bench_encoders.py [--width 1920] [--height 1080] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from encoders import FORMATS, PROFILES, make_encoder
+
+
+def text_ui(size):
+    """Dark IDE-like window: panels, many short text lines, a few accent colours"""
+    img = Image.new("RGB", size, "#1E1E1E")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, size[0] // 6, size[1]), fill="#252526")
+    for y in range(8, size[1], 18):
+        indent = (y // 18 % 5) * 16
+        draw.text((size[0] // 6 + 20 + indent, y), "def render(self, box, resample): return level.resize(size)", fill="#D4D4D4")
+        draw.text((12, y), f"file_{y // 18:03d}.py", fill="#9CDCFE")
+    return img
+
+
+def photo(size):
+    """Noisy, smoothly shaded content that defeats run-length tricks"""
+    noise = Image.effect_noise(size, 64).filter(ImageFilter.GaussianBlur(2))
+    gradient = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (noise, gradient, Image.effect_mandelbrot(size, (-2, -1.2, 1, 1.2), 64)))
+
+
+def solid(size):
+    img = Image.new("RGB", size, "#F3F3F3")
+    ImageDraw.Draw(img).rectangle((size[0] // 4, size[1] // 4, size[0] * 3 // 4, size[1] * 3 // 4), fill="#0078D4")
+    return img
+
+
+CONTENT = {"text UI": text_ui, "photo": photo, "solid": solid}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    size = (args.width, args.height)
+
+    print(f"{'content':<9}{'format':<7}{'profile':<10}{'ms':>9}{'KB':>10}")
+    for label, make in CONTENT.items():
+        image = make(size)
+        for fmt in FORMATS:
+            for profile in PROFILES:
+                encoder = make_encoder(fmt, profile)
+                times = []
+                for _ in range(args.repeat):
+                    buf = io.BytesIO()
+                    t0 = time.perf_counter(); encoder.save(image, buf); times.append(time.perf_counter() - t0)
+                print(f"{label:<9}{encoder.format.lower():<7}{profile:<10}{min(times) * 1000:>9.1f}{buf.tell() / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_file_list.py
+"""Memory and Tk item count of the virtualized file list vs ttk.Treeview.
+
+Needs a display. Usage: python benchmarks/bench_file_list.py [--counts 10000 25000 50000] [--treeview]
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageTk
+
+from file_list import VirtualFileList
+from thumbnails import THUMBNAIL_SIZE
+
+
+def rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def settle(root):
+    root.update_idletasks(); root.update()
+
+
+def bench_virtual(root, count, thumb):
+    frame = ttk.Frame(root); frame.pack(fill="both", expand=True)
+    images = {}
+    def on_viewport(visible, window):
+        images.clear()
+        for item in window: images[item] = ImageTk.PhotoImage(thumb); lst.item(item, image=images[item])
+    lst = VirtualFileList(frame, headings=("Превью", "Имя файла"), viewport_command=on_viewport)
+    lst.pack(fill="both", expand=True); settle(root)
+    before = rss_mb(); t0 = time.perf_counter()
+    for i in range(count): lst.insert("", "end", values=(f"screenshot_{i:06d}.png",))
+    settle(root); fill = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for step in range(100): lst.yview("moveto", step / 100); settle(root)
+    scroll = (time.perf_counter() - t0) / 100
+    t0 = time.perf_counter(); lst.selection_set(lst.get_children()); settle(root); select_all = time.perf_counter() - t0
+    result = (fill, scroll, select_all, len(lst.canvas.find_all()), len(images), rss_mb() - before)
+    frame.destroy(); settle(root)
+    return result
+
+
+def bench_treeview(root, count, thumb):
+    frame = ttk.Frame(root); frame.pack(fill="both", expand=True)
+    tree = ttk.Treeview(frame, columns=("filename",), show="tree headings", selectmode="extended")
+    tree.pack(fill="both", expand=True); settle(root)
+    before = rss_mb(); t0 = time.perf_counter(); images = []
+    for i in range(count):
+        photo = ImageTk.PhotoImage(thumb); images.append(photo)
+        tree.insert("", "end", image=photo, values=(f"screenshot_{i:06d}.png",))
+    settle(root); fill = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for step in range(100): tree.yview_moveto(step / 100); settle(root)
+    scroll = (time.perf_counter() - t0) / 100
+    t0 = time.perf_counter(); tree.selection_set(tree.get_children()); settle(root); select_all = time.perf_counter() - t0
+    result = (fill, scroll, select_all, count, len(images), rss_mb() - before)
+    frame.destroy(); del images; settle(root)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 25000, 50000])
+    parser.add_argument("--treeview", action="store_true", help="also measure the old ttk.Treeview + PhotoImage per row")
+    args = parser.parse_args()
+
+    root = tk.Tk(); root.geometry("400x700")
+    thumb = Image.new("RGBA", THUMBNAIL_SIZE, (0, 122, 204, 255))
+    print(f"{'widget':<10}{'rows':>8}{'fill s':>9}{'scroll ms':>11}{'sel-all s':>11}{'tk items':>10}{'images':>8}{'RSS +MB':>9}")
+    for count in args.counts:
+        variants = [("virtual", bench_virtual)] + ([("treeview", bench_treeview)] if args.treeview else [])
+        for name, fn in variants:
+            fill, scroll, select_all, items, images, rss = fn(root, count, thumb)
+            print(f"{name:<10}{count:>8}{fill:>9.2f}{scroll * 1000:>11.2f}{select_all:>11.3f}{items:>10}{images:>8}{rss:>9.1f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
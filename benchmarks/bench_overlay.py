@@ -0,0 +1,70 @@
+# benchmarks/bench_overlay.py
+"""Selection overlay preparation time: old RGBA composite vs selection.dim_image.
+
+Usage: python benchmarks/bench_overlay.py [--repeat 5]
+The PhotoImage columns (new PhotoImage vs paste into the reused one) need a
+display and are skipped without one. In the app the full hotkey-to-overlay
+breakdown is logged on every selection (SimpleSelection.last_timings).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageDraw
+
+from selection import DIM_ALPHA, dim_image
+
+SIZES = {"1080p": (1920, 1080), "1440p": (2560, 1440), "4K": (3840, 2160)}
+
+
+def old_dim(screenshot):
+    overlay = Image.new('RGBA', screenshot.size, (0, 0, 0, DIM_ALPHA))
+    return Image.alpha_composite(screenshot.convert('RGBA'), overlay)
+
+
+def screenshot(size):
+    img = Image.new("RGB", size, "#1E1E1E")
+    draw = ImageDraw.Draw(img)
+    for y in range(8, size[1], 18):
+        draw.text((40 + (y // 18 % 5) * 16, y), "def render(self, box, resample): return level.resize(size)", fill="#D4D4D4")
+    return img
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    root = None
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk(); root.withdraw()
+    except Exception as e:
+        print(f"no display ({e.__class__.__name__}), PhotoImage timings skipped")
+
+    print(f"{'size':<7}{'old ms':>9}{'new ms':>9}{'max diff':>10}{'new photo':>11}{'paste':>8}")
+    for label, size in SIZES.items():
+        image = screenshot(size)
+        old = best_ms(lambda: old_dim(image), args.repeat)
+        new = best_ms(lambda: dim_image(image), args.repeat)
+        diff = max(hi for lo, hi in ImageChops.difference(old_dim(image).convert("RGB"), dim_image(image)).getextrema())
+        line = f"{label:<7}{old:>9.1f}{new:>9.1f}{diff:>10}"
+        if root is not None:
+            dimmed = dim_image(image); photo = ImageTk.PhotoImage(dimmed)
+            line += f"{best_ms(lambda: ImageTk.PhotoImage(dimmed), args.repeat):>11.1f}{best_ms(lambda: photo.paste(dimmed), args.repeat):>8.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_qr.py
+"""QR decode success rate and latency: raw pyzbar call vs the qr_scan pipeline.
+
+Usage: python benchmarks/bench_qr.py [--repeat 3]
+Runs over the generated images in benchmarks/qr_samples (see
+make_qr_samples.py). Needs pyzbar and the zbar shared library.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from qr_scan import QrScanner, zbar_decode
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qr_samples")
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); result = fn(); times.append(time.perf_counter() - t0)
+    return result, min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if zbar_decode is None: sys.exit("pyzbar / zbar library not available")
+
+    with open(os.path.join(SAMPLES, "manifest.json"), encoding="utf-8") as f: manifest = json.load(f)
+    print(f"{'sample':<26}{'raw':>5}{'raw ms':>8}{'pipeline':>10}{'ms':>8}{'tries':>7}  {'found by':<16}{'cached ms':>10}")
+    raw_ok = new_ok = 0
+    for filename, expected in manifest.items():
+        image = Image.open(os.path.join(SAMPLES, filename)).convert("RGB")
+        found, raw_ms = best_ms(lambda: zbar_decode(image), args.repeat)
+        raw_hit = any(o.data.decode("utf-8", "ignore") == expected for o in found)
+        result, new_ms = best_ms(lambda: QrScanner().scan(image), args.repeat)  # fresh scanner: no cache
+        scanner = QrScanner(); scanner.scan(image)
+        _, cached_ms = best_ms(lambda: scanner.scan(image), args.repeat)
+        new_hit = expected in result.texts
+        raw_ok += raw_hit; new_ok += new_hit
+        print(f"{filename[:-4]:<26}{'yes' if raw_hit else 'no':>5}{raw_ms:>8.1f}{'yes' if new_hit else 'no':>10}{new_ms:>8.1f}"
+              f"{result.attempts:>7}  {result.attempt:<16}{cached_ms:>10.2f}")
+    total = len(manifest)
+    print(f"success: raw {raw_ok}/{total} ({raw_ok / total:.0%}), pipeline {new_ok}/{total} ({new_ok / total:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_recording.py
+"""Sustained recording fps, file size and peak memory on a 1080p region.
+
+Usage: python benchmarks/bench_recording.py [--seconds 10] [--fps 30] [--formats apng gif webp]
+Frames come from a synthetic backend (no display needed): a static UI with a
+blinking cursor and a moving element ("typing") or a scrolling page ("scroll").
+Each case runs in a fresh process so peak RSS belongs to that case alone.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from capture import CaptureBackend
+from recording import RegionRecorder, RECORD_FORMATS
+from bench_decode import peak_rss_mb
+
+SIZE = (1920, 1080)
+
+
+class SyntheticBackend(CaptureBackend):
+    def __init__(self, scenario):
+        self.scenario = scenario; self.k = 0
+        page = Image.new("RGB", (SIZE[0], SIZE[1] * 3), "#1E1E1E")
+        draw = ImageDraw.Draw(page)
+        for y in range(0, page.height, 18):
+            draw.text((40 + (y // 18 % 6) * 16, y), f"{y // 18:05d}  result = compute(frame, region, options)", fill="#D4D4D4")
+        self.page = page
+
+    def grab(self, bbox=None):
+        self.k += 1
+        if self.scenario == "scroll":
+            top = (self.k * 6) % (self.page.height - SIZE[1])
+            return self.page.crop((0, top, SIZE[0], top + SIZE[1]))
+        frame = self.page.crop((0, 0) + SIZE)
+        draw = ImageDraw.Draw(frame)
+        draw.text((40, 540), "typed: " + "x" * (self.k // 3 % 80), fill="#FFFFFF")
+        if self.k // 15 % 2: draw.rectangle((600, 600, 602, 618), fill="#FFFFFF")
+        return frame
+
+
+def run_case(args):
+    fmt, scenario, seconds, fps = args
+    before = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rec" + RECORD_FORMATS[fmt])
+        recorder = RegionRecorder(None, SyntheticBackend(scenario), (0, 0) + SIZE, path, fmt, fps, max_seconds=seconds)
+        recorder.start(); stats, error = recorder.wait()
+        if error: raise error
+        return stats._replace(path=""), stats.fps, os.path.getsize(path), peak_rss_mb() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--formats", nargs="+", default=list(RECORD_FORMATS), choices=list(RECORD_FORMATS))
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"target {args.fps:g} fps for {args.seconds:g} s on {SIZE[0]}x{SIZE[1]}")
+    print(f"{'format':<7}{'scenario':<9}{'fps':>7}{'written':>9}{'same':>7}{'dropped':>9}{'MB out':>8}{'peak MB':>9}")
+    for fmt in args.formats:
+        for scenario in ("typing", "scroll"):
+            with ctx.Pool(1, maxtasksperchild=1) as pool:
+                stats, fps, size, peak = pool.apply(run_case, ((fmt, scenario, args.seconds, args.fps),))
+            print(f"{fmt:<7}{scenario:<9}{fps:>7.1f}{stats.written:>9}{stats.unchanged:>7}{stats.dropped:>9}{size / 2**20:>8.1f}{peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
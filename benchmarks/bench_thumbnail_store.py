@@ -0,0 +1,66 @@
+# benchmarks/bench_thumbnail_store.py
+"""Cold vs warm library load with the persistent thumbnail store.
+
+Usage: python benchmarks/bench_thumbnail_store.py [--count 5000] [--width 1920] [--height 1080]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from thumbnails import ThumbnailStore, IMAGE_EXTENSIONS
+
+
+def make_library(directory, count, size):
+    """Fill directory with synthetic screenshot-like PNGs (flat UI panels + text lines)"""
+    base = Image.new("RGB", size, "#1E1E1E")
+    draw = ImageDraw.Draw(base)
+    for y in range(0, size[1], 48):
+        draw.rectangle((20, y + 8, size[0] // 3, y + 40), fill="#2D2D2D")
+        draw.text((30, y + 16), "CappyFox benchmark row", fill="#E0E0E0")
+    for i in range(count):
+        img = base.copy()
+        ImageDraw.Draw(img).rectangle((size[0] // 2, 0, size[0] // 2 + (i % 500), 60), fill=(i % 256, 120, 200))
+        img.save(os.path.join(directory, f"screenshot_{i:05d}.png"), compress_level=1)
+
+
+def load_library(store):
+    entries = [e for e in os.scandir(store.library_dir) if e.name.lower().endswith(IMAGE_EXTENSIONS) and e.is_file()]
+    keys = [store.load(e.path, e.stat().st_mtime_ns, e.stat().st_size)[0] for e in entries]
+    store.prune(keys)
+    return len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating {args.count} images at {args.width}x{args.height}...")
+        make_library(directory, args.count, (args.width, args.height))
+
+        store = ThumbnailStore(directory)
+        t0 = time.perf_counter(); n = load_library(store); cold = time.perf_counter() - t0
+        t0 = time.perf_counter(); load_library(store); warm = time.perf_counter() - t0
+
+        touched = os.path.join(directory, "screenshot_00000.png")
+        os.utime(touched, ns=(time.time_ns(), time.time_ns() + 10**9))
+        t0 = time.perf_counter(); load_library(store); one_changed = time.perf_counter() - t0
+
+        print(f"images:         {n}")
+        print(f"cold load:      {cold:8.3f} s  ({cold / n * 1000:.2f} ms/image)")
+        print(f"warm load:      {warm:8.3f} s  ({warm / n * 1000:.2f} ms/image)")
+        print(f"1 file changed: {one_changed:8.3f} s")
+        print(f"speedup:        {cold / warm:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
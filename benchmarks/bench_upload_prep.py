@@ -0,0 +1,96 @@
+# benchmarks/bench_upload_prep.py
+"""Upload preparation cost: re-encoding the decoded image to PNG vs streaming the file on disk.
+
+Usage: python benchmarks/bench_upload_prep.py [--repeat 3]
+For each sample file, builds the request body the way requests would send
+it and reads it out in 16 KB blocks, as the socket would:
+  re-encode  the old library path: the decoded image saved to a PNG
+             BytesIO and posted with files=, which copies it again
+  stream     uploads.MultipartFile over the file itself
+  capture    a fresh capture with no file: PNG encoded in memory once and
+             wrapped without a copy
+Each case runs in its own spawned process; peak MB is the rise in peak
+RSS over the process baseline (the decoded image included where the path
+needs one).
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from PIL import Image, ImageDraw
+
+from bench_decode import peak_rss_mb
+from uploads import MultipartFile
+
+URL = "http://127.0.0.1/user/api.php"
+BLOCK = 16384
+
+
+def make_samples(directory):
+    screen = Image.new("RGB", (3840, 2160), "#1E1E1E"); draw = ImageDraw.Draw(screen)
+    for y in range(8, 2160, 18): draw.text((40 + (y // 18 % 7) * 12, y), "def post(self, job): return self.session.post(self.api_url, data=body) " * 4, fill="#D4D4D4")
+    photo = Image.merge("RGB", [Image.effect_noise((3840, 2160), s).resize((3840, 2160)) for s in (40, 60, 80)])
+    photo = Image.blend(photo, Image.linear_gradient("L").resize((3840, 2160)).convert("RGB"), 0.6)
+    samples = {"screenshot_4k.png": screen, "photo_4k.jpg": photo, "screenshot_8k.png": screen.resize((7680, 4320))}
+    for name, image in samples.items(): image.save(os.path.join(directory, name), quality=90)
+    return list(samples)
+
+
+def drain(prepared):
+    body = prepared.body; sent = 0
+    if isinstance(body, bytes): body = io.BytesIO(body)
+    while True:
+        block = body.read(BLOCK)
+        if not block: return sent
+        sent += len(block)
+
+
+def run_case(args):
+    mode, path = args
+    before = peak_rss_mb()
+    if mode == "stream":
+        t0 = time.perf_counter()
+        with MultipartFile({"reqtype": "fileupload"}, "fileToUpload", os.path.basename(path), path) as body:
+            sent = drain(requests.Request("POST", URL, data=body, headers={"Content-Type": body.content_type}).prepare())
+        return time.perf_counter() - t0, sent, peak_rss_mb() - before
+    image = Image.open(path); image.load()  # re-encode and capture both start from a decoded image
+    t0 = time.perf_counter()
+    with io.BytesIO() as buffer:
+        image.save(buffer, "PNG")
+        if mode == "re-encode":
+            buffer.seek(0)
+            prepared = requests.Request("POST", URL, data={"reqtype": "fileupload"}, files={"fileToUpload": ("ss.png", buffer)}).prepare()
+            sent = drain(prepared)
+        else:
+            data = buffer.getvalue()
+            with MultipartFile({"reqtype": "fileupload"}, "fileToUpload", "screenshot.png", data) as body:
+                sent = drain(requests.Request("POST", URL, data=body, headers={"Content-Type": body.content_type}).prepare())
+    return time.perf_counter() - t0, sent, peak_rss_mb() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'file':<20}{'MB on disk':>11}  {'path':<11}{'prep ms':>9}{'MB sent':>9}{'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in make_samples(directory):
+            path = os.path.join(directory, name)
+            for mode in ("re-encode", "stream", "capture"):
+                runs = []
+                for _ in range(args.repeat):
+                    with ctx.Pool(1, maxtasksperchild=1) as pool: runs.append(pool.apply(run_case, ((mode, path),)))
+                seconds, sent, peak = min(runs)
+                print(f"{name:<20}{os.path.getsize(path) / 2**20:>11.1f}  {mode:<11}{seconds * 1000:>9.1f}{sent / 2**20:>9.1f}{peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
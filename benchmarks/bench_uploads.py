@@ -0,0 +1,104 @@
+# benchmarks/bench_uploads.py
+"""Upload latency and reliability: a thread and requests.post per upload vs uploads.UploadManager.
+
+Usage: python benchmarks/bench_uploads.py [--uploads 40] [--latency-ms 50] [--connect-ms 100] [--fail-rate 0.2] [--workers 2 4]
+Runs against benchmarks/catbox_stub.py on localhost over HTTPS, with
+--connect-ms added to every new connection for the handshake round trips
+of a real network. Three runs: uploads one after another (what a user
+uploading shots in a row sees), all of them at once, and all at once
+with a share of requests failing with 503.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from PIL import Image, ImageDraw
+
+from catbox_stub import CatboxStub
+from uploads import UploadManager
+
+
+def make_files(directory, count):
+    image = Image.new("RGB", (1280, 720), "#1E1E1E"); draw = ImageDraw.Draw(image)
+    for y in range(8, 720, 18): draw.text((40, y), "def upload(self, job): return self.session.post(url, files=files)", fill="#D4D4D4")
+    paths = []
+    for i in range(count):
+        frame = image.copy(); ImageDraw.Draw(frame).text((1100, 20), f"frame {i}", fill="#FFFFFF")
+        paths.append(os.path.join(directory, f"shot_{i:03d}.png")); frame.save(paths[-1])
+    return paths
+
+
+def old_upload(stub, path, ok):
+    """What _upload_to_catbox used to do: a fresh connection and one attempt"""
+    try:
+        with open(path, "rb") as f: data = io.BytesIO(f.read())
+        r = requests.post(stub.api_url, data={"reqtype": "fileupload"}, files={"fileToUpload": ("ss.png", data)}, timeout=20, verify=stub.certfile)
+        r.raise_for_status(); ok.append(r.text)
+    except Exception: pass
+
+
+def old_style(stub, paths, sequential):
+    ok = []
+    if sequential:
+        for path in paths: old_upload(stub, path, ok)
+        return len(ok)
+    threads = [threading.Thread(target=old_upload, args=(stub, path, ok)) for path in paths]  # a thread per upload
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return len(ok)
+
+
+def managed(stub, paths, workers, directory, sequential):
+    done = []
+    manager = UploadManager(None, lambda job, url: done.append(url), lambda job, e: None, stub.api_url,
+                            queue_file=os.path.join(directory, "queue.json"), spool_dir=os.path.join(directory, "spool"),
+                            workers=workers, backoff_base=0.05, backoff_max=1.0)
+    manager.session.verify = stub.certfile; manager.session.trust_env = False  # REQUESTS_CA_BUNDLE would override verify
+    for path in paths:
+        manager.upload_file(path)
+        while sequential and manager.pending: time.sleep(0.002)
+    while manager.pending: time.sleep(0.002)
+    manager._pump()  # no Tk loop here: deliver the results directly
+    manager.close()
+    return len(done)
+
+
+def measure(label, args, paths, directory, fail_rate=0.0, sequential=False):
+    print(f"{label}\n{'client':<24}{'seconds':>9}{'ms/upload':>11}{'ok':>8}{'requests':>10}{'connections':>13}")
+    cases = [("thread per upload" if not sequential else "requests.post", lambda stub: old_style(stub, paths, sequential))]
+    for w in ([1] if sequential else args.workers):
+        cases.append((f"manager, {w} worker{'s' * (w > 1)}", lambda stub, w=w: managed(stub, paths, w, directory, sequential)))
+    for name, fn in cases:
+        stub = CatboxStub(latency_ms=args.latency_ms, fail_rate=fail_rate, tls=True, connect_ms=args.connect_ms).start()
+        t0 = time.perf_counter(); ok = fn(stub); seconds = time.perf_counter() - t0
+        print(f"{name:<24}{seconds:>9.2f}{seconds / len(paths) * 1000:>11.1f}{f'{ok}/{len(paths)}':>8}{stub.requests:>10}{stub.connections:>13}")
+        stub.stop()
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--connect-ms", type=float, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_files(directory, args.uploads)
+        size = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024
+        print(f"{args.uploads} uploads of {size:.0f} KB, {args.latency_ms:g} ms server latency, {args.connect_ms:g} ms per new connection\n")
+        measure("one after another", args, paths, directory, sequential=True)
+        measure("all at once", args, paths, directory)
+        measure(f"all at once, {args.fail_rate:.0%} of requests fail with 503", args, paths, directory, fail_rate=args.fail_rate)
+
+
+if __name__ == "__main__":
+    main()
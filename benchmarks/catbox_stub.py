@@ -0,0 +1,110 @@
+# benchmarks/catbox_stub.py
+"""Local stand-in for the catbox.moe upload API.
+
+Usage: python benchmarks/catbox_stub.py [--port 8765] [--latency-ms 50] [--connect-ms 100] [--fail-rate 0.2] [--tls]
+Accepts the same multipart form as https://catbox.moe/user/api.php
+(reqtype=fileupload, fileToUpload=<file>) over keep-alive HTTP/1.1 and
+answers with a URL under /files/. --fail-rate makes that share of requests
+fail with 503 to exercise retries; --tls serves HTTPS with a throwaway
+self-signed certificate made by the openssl command line tool, so the cost
+of TLS handshakes shows up as well. On loopback handshakes are nearly
+free; --connect-ms delays every new connection to stand in for the TCP
+and TLS round trips of a real network. Point the app at it with the
+upload_api_url setting.
+"""
+import argparse
+import os
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+    def setup(self):
+        super().setup()  # one handler per TCP connection
+        with self.server.lock: self.server.connections += 1
+        if self.server.connect_delay: time.sleep(self.server.connect_delay)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.requests += 1; server.bytes_received += len(body)
+        if server.latency: time.sleep(server.latency)
+        if server.fail_rate and random.random() < server.fail_rate:
+            return self._reply(503, "Service Unavailable")
+        if b'name="reqtype"' not in body or b'name="fileToUpload"' not in body:
+            return self._reply(412, "No request type given.")
+        with server.lock: server.uploads += 1
+        self._reply(200, f"{server.base_url}/files/{uuid.uuid4().hex[:6]}.png")
+
+    def _reply(self, status, text):
+        data = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain"); self.send_header("Content-Length", str(len(data)))
+        self.end_headers(); self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def self_signed_cert(directory):
+    """(certfile, keyfile) for 127.0.0.1, made with the openssl CLI"""
+    cert, key = os.path.join(directory, "stub.crt"), os.path.join(directory, "stub.key")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+                    "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", key, "-out", cert], check=True, capture_output=True)
+    return cert, key
+
+
+class CatboxStub(ThreadingHTTPServer):
+    """The stub server; start() serves on a daemon thread, api_url is what to upload to.
+    With tls=True, certfile is the certificate clients should verify against."""
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0, fail_rate=0.0, tls=False, connect_ms=0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency_ms / 1000; self.connect_delay = connect_ms / 1000; self.fail_rate = fail_rate
+        self.lock = threading.Lock(); self.connections = self.requests = self.uploads = self.bytes_received = 0
+        self.certfile = None; self._tmp = None
+        if tls:
+            self._tmp = tempfile.TemporaryDirectory()
+            self.certfile, keyfile = self_signed_cert(self._tmp.name)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER); context.load_cert_chain(self.certfile, keyfile)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+        scheme = "https" if tls else "http"
+        self.base_url = f"{scheme}://127.0.0.1:{self.server_address[1]}"
+        self.api_url = self.base_url + "/user/api.php"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown(); self.server_close()
+        if self._tmp: self._tmp.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--connect-ms", type=float, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+    stub = CatboxStub(args.port, args.latency_ms, args.fail_rate, args.tls, args.connect_ms)
+    print(f"upload_api_url: {stub.api_url}" + (f"  (certificate: {stub.certfile})" if stub.certfile else ""))
+    try: stub.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: stub.stop()
+
+
+if __name__ == "__main__":
+    main()
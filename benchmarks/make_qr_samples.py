@@ -0,0 +1,72 @@
+# benchmarks/make_qr_samples.py
+"""Regenerate the QR test images in benchmarks/qr_samples used by bench_qr.py.
+
+Usage: python benchmarks/make_qr_samples.py   (needs: pip install segno)
+Every payload is rendered as each of the hard cases the scanner has to
+handle; expected texts go to qr_samples/manifest.json.
+"""
+import argparse
+import io
+import json
+import os
+import random
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageOps
+
+import segno
+
+OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qr_samples")
+PAYLOADS = {
+    "url": "https://files.catbox.moe/abc123.png",
+    "text": "CappyFox QA build 2.4.1 / ticket 1187 / Дефект на экране настроек",
+}
+
+
+def render(payload, scale):
+    buf = io.BytesIO(); segno.make(payload, error="m").save(buf, kind="png", scale=scale, border=4)
+    buf.seek(0); return Image.open(buf).convert("L")
+
+
+def ui_background(size):
+    img = Image.new("L", size, 236)
+    draw = ImageDraw.Draw(img)
+    for y in range(10, size[1], 18): draw.text((20 + (y // 18 % 4) * 12, y), "Lorem ipsum dolor sit amet, consectetur adipiscing", fill=60)
+    return img
+
+
+def variants(payload):
+    rnd = random.Random(7)
+    yield "clean", render(payload, 4)
+    yield "tiny", render(payload, 1)  # one pixel per module
+    yield "low_contrast", render(payload, 3).point(lambda v: 150 if v < 128 else 175)
+    big = render(payload, 3)
+    yield "scaled_blurred", big.resize((big.width * 3 // 5, big.height * 3 // 5), Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(0.6))
+    yield "rotated_30", render(payload, 4).rotate(30, Image.Resampling.BICUBIC, expand=True, fillcolor=255)
+    yield "dark_mode", ImageOps.invert(render(payload, 4)).point(lambda v: 30 if v < 128 else 220)
+    code = render(payload, 3)
+    shade = Image.linear_gradient("L").rotate(90).resize(code.size)
+    yield "uneven_light", ImageChops.multiply(code.point(lambda v: 110 if v < 128 else 255), shade.point(lambda v: 90 + v * 165 // 255))
+    noisy = render(payload, 3)
+    yield "noisy", Image.blend(noisy, Image.effect_noise(noisy.size, 60), 0.35)
+    page = ui_background((1600, 900)); small = render(payload, 2)
+    page.paste(small, (rnd.randrange(200, 1300), rnd.randrange(100, 600)))
+    yield "in_screenshot", page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    os.makedirs(OUT_DIR, exist_ok=True)
+    manifest = {}
+    for name, payload in PAYLOADS.items():
+        for case, image in variants(payload):
+            filename = f"{name}_{case}.png"
+            image.convert("RGB").save(os.path.join(OUT_DIR, filename), optimize=True)
+            manifest[filename] = payload
+    with open(os.path.join(OUT_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"{len(manifest)} images written to {OUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# burst.py
+import time
+import datetime
+import threading
+from collections import deque
+from typing import Callable, NamedTuple, Optional
+
+from PIL import Image, ImageChops
+
+from cache import estimate_bytes
+from capture import BBox, CaptureBackend
+from capture_writer import CaptureWriter
+
+
+class BurstStats(NamedTuple):
+    captured: int    # frames grabbed
+    duplicates: int  # identical to the previous frame, skipped
+    dropped: int     # pushed out of the ring buffer before they could be written
+    saved: int       # handed to the writer
+
+
+def frames_equal(a: Image.Image, b: Image.Image) -> bool:
+    """Pixel-exact comparison done in C: difference image, then its bounding box"""
+    return a.size == b.size and a.mode == b.mode and ImageChops.difference(a, b).getbbox() is None
+
+
+class BurstCapture:
+    """Interval capture into a bounded ring buffer, deduplicated and written in the background.
+
+    A capture thread grabs a frame every interval_ms and skips it when it is
+    identical to the previous one. Unique frames wait in a ring buffer bounded
+    by both buffer_frames and buffer_bytes (a frame of all monitors can be
+    100 MB, so a frame count alone does not bound memory); a Tk-side pump
+    hands them to the CaptureWriter only while its backlog is short, so a
+    slow disk drops the oldest frames instead of growing memory. on_finish(BurstStats) runs on the Tk thread once the last
+    frame has been handed over.
+    """
+    PUMP_INTERVAL_MS = 50
+    WRITER_BACKLOG = 2
+    PREFIX = "burst"
+    BUFFER_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, master, backend: CaptureBackend, writer: CaptureWriter,
+                 on_finish: Callable[[BurstStats], None]):
+        self.master = master
+        self.backend = backend
+        self.writer = writer
+        self.on_finish = on_finish
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ring: deque = deque()  # (captured_at, frame, nbytes)
+        self._ring_lock = threading.Lock()
+        self._ring_bytes = 0; self._max_frames = 1; self._max_bytes = self.BUFFER_BYTES
+        self._paths = set()
+        self._directory = ""
+        self._captured = self._duplicates = self._dropped = self._saved = 0
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self, directory: str, interval_ms: int = 500, duration_s: float = 30, buffer_frames: int = 20,
+              bbox: Optional[BBox] = None, buffer_bytes: Optional[int] = None):
+        """bbox: region to capture (resolve the monitor on the Tk thread), None for all screens"""
+        if self.active: return
+        self._directory = directory
+        self._ring = deque(); self._ring_bytes = 0
+        self._max_frames = max(1, buffer_frames); self._max_bytes = buffer_bytes or self.BUFFER_BYTES
+        self._captured = self._duplicates = self._dropped = self._saved = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._capture_loop, args=(max(20, interval_ms) / 1000, duration_s, bbox), daemon=True)
+        self._thread.start()
+        self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+
+    def stop(self):
+        self._stop.set()
+
+    def claims(self, path: str) -> bool:
+        """True (once) for files written by this burst, so the app can skip per-file notifications"""
+        if path in self._paths: self._paths.discard(path); return True
+        return False
+
+    def _capture_loop(self, interval: float, duration: float, bbox: Optional[BBox]):
+        previous = None
+        start = time.perf_counter(); deadline = start + duration; tick = 0
+        try:
+            while not self._stop.is_set() and time.perf_counter() < deadline:
+                when = datetime.datetime.now()
+                try: frame = self.backend.grab(bbox)
+                except Exception as e: print(f"Burst capture failed: {e}"); break
+                self._captured += 1
+                if previous is not None and frames_equal(frame, previous): self._duplicates += 1
+                else: self._buffer(when, frame)
+                previous = frame
+                # Fixed-rate schedule; ticks missed by a slow grab are skipped, not bunched up
+                tick = max(tick + 1, int((time.perf_counter() - start) / interval))
+                self._stop.wait(max(0.0, start + tick * interval - time.perf_counter()))
+        finally:
+            self.backend.release_thread(); self._stop.set()
+
+    def _buffer(self, when: datetime.datetime, frame: Image.Image):
+        """Append to the ring, dropping the oldest frames past the frame or byte limit (the newest always stays)"""
+        nbytes = estimate_bytes(frame)
+        with self._ring_lock:
+            self._ring.append((when, frame, nbytes)); self._ring_bytes += nbytes
+            while len(self._ring) > 1 and (len(self._ring) > self._max_frames or self._ring_bytes > self._max_bytes):
+                self._ring_bytes -= self._ring.popleft()[2]; self._dropped += 1
+
+    def _pump(self):
+        while self._ring and self.writer.pending < self.WRITER_BACKLOG:
+            with self._ring_lock:
+                when, frame, nbytes = self._ring.popleft(); self._ring_bytes -= nbytes
+            self._paths.add(self.writer.submit(frame, self._directory, self.PREFIX, captured_at=when, millis=True))
+            self._saved += 1
+        if self._thread.is_alive() or self._ring:
+            self.master.after(self.PUMP_INTERVAL_MS, self._pump); return
+        self._thread = None
+        self.on_finish(BurstStats(self._captured, self._duplicates, self._dropped, self._saved))
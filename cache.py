@@ -0,0 +1,97 @@
+# cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+from PIL import Image
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    used_bytes: int
+    budget_bytes: int
+
+
+def estimate_bytes(value: Any) -> int:
+    """Approximate pixel-buffer size of a cached image-like value"""
+    if isinstance(value, Image.Image): return value.width * value.height * len(value.getbands())
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None: return int(nbytes)
+    # ImageTk.PhotoImage: Tk keeps photos as 32-bit RGBA
+    width, height = getattr(value, "width", None), getattr(value, "height", None)
+    if callable(width) and callable(height): return width() * height() * 4
+    return 0
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the estimated bytes of its values.
+
+    Lookups and inserts are O(1) (OrderedDict.move_to_end); eviction pops the
+    least recently used entries until the budget fits. Evicted values are only
+    dropped, never collected explicitly: whoever still references them (a
+    widget showing a PhotoImage) keeps them alive.
+    """
+    def __init__(self, budget_bytes: int, sizeof: Callable[[Any], int] = estimate_bytes, name: str = ""):
+        self.name = name
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: self.misses += 1; return default
+            self._entries.move_to_end(key); self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes: Optional[int] = None):
+        """Insert value; one larger than the whole budget is not cached at all"""
+        nbytes = self._sizeof(value) if nbytes is None else nbytes
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None: self.used_bytes -= old[1]
+            if nbytes > self.budget_bytes: return
+            self._entries[key] = (value, nbytes); self.used_bytes += nbytes
+            self._evict()
+
+    def get_or_load(self, key, loader: Callable[[], Any]):
+        value = self.get(key)
+        if value is None:
+            value = loader(); self.put(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None: return default
+            self.used_bytes -= entry[1]
+            return entry[0]
+
+    def resize(self, budget_bytes: int):
+        with self._lock:
+            self.budget_bytes = budget_bytes; self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear(); self.used_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._entries), self.used_bytes, self.budget_bytes)
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.used_bytes -= nbytes; self.evictions += 1
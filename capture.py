@@ -0,0 +1,179 @@
+# capture.py
+import sys
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageGrab
+
+try:
+    import mss  # optional: grabs exactly the requested region on every platform
+except ImportError:
+    mss = None
+
+IS_WINDOWS = sys.platform == "win32"
+
+BBox = Tuple[int, int, int, int]  # left, top, right, bottom in virtual-desktop coordinates
+
+
+class Monitor(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def bbox(self) -> BBox:
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def contains_bbox(self, bbox: BBox) -> bool:
+        return self.x <= bbox[0] and self.y <= bbox[1] and bbox[2] <= self.x + self.width and bbox[3] <= self.y + self.height
+
+
+def union_bbox(monitors: List[Monitor]) -> BBox:
+    return (min(m.x for m in monitors), min(m.y for m in monitors),
+            max(m.x + m.width for m in monitors), max(m.y + m.height for m in monitors))
+
+
+class CaptureBackend:
+    """Screen capture in virtual-desktop coordinates.
+
+    Subclasses implement monitors(), cursor_position() and grab(bbox); grab(None)
+    means every screen. The helpers below only ever grab what they return.
+    """
+    def monitors(self) -> List[Monitor]:
+        raise NotImplementedError
+
+    def cursor_position(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def grab(self, bbox: Optional[BBox] = None) -> Image.Image:
+        raise NotImplementedError
+
+    def release_thread(self):
+        """Free what grabs on the calling thread hold; capture threads call it before they end"""
+
+    def monitor_at(self, x: int, y: int) -> Monitor:
+        monitors = self.monitors()
+        return next((m for m in monitors if m.contains(x, y)), monitors[0])
+
+    def monitor_under_cursor(self) -> Monitor:
+        return self.monitor_at(*self.cursor_position())
+
+    def grab_monitor(self, monitor: Monitor) -> Image.Image:
+        return self.grab(monitor.bbox)
+
+    def grab_under_cursor(self) -> Tuple[Monitor, Image.Image]:
+        monitor = self.monitor_under_cursor()
+        return monitor, self.grab_monitor(monitor)
+
+
+def _win32_monitors() -> List[Monitor]:
+    import ctypes
+    from ctypes import wintypes
+    monitors = []
+    proc_type = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    def callback(hmonitor, hdc, rect, data):
+        r = rect.contents; monitors.append(Monitor(r.left, r.top, r.right - r.left, r.bottom - r.top)); return 1
+    ctypes.windll.user32.EnumDisplayMonitors(None, None, proc_type(callback), 0)
+    # Primary monitor (the one at the origin) first, like mss and Tk
+    return sorted(monitors, key=lambda m: (m.x, m.y) != (0, 0))
+
+
+def _win32_cursor_position() -> Tuple[int, int]:
+    import ctypes
+    from ctypes import wintypes
+    point = wintypes.POINT(); ctypes.windll.user32.GetCursorPos(ctypes.byref(point))
+    return point.x, point.y
+
+
+class PillowBackend(CaptureBackend):
+    """ImageGrab-based capture.
+
+    On Windows ImageGrab can only grab the primary screen or all of them, so a
+    region on a secondary monitor still goes through an all-screens grab; X11
+    and macOS grab the region itself. Without Win32 the monitor layout falls
+    back to the Tk screen size.
+    """
+    def __init__(self, tk_root=None):
+        self.tk_root = tk_root
+
+    def monitors(self) -> List[Monitor]:
+        if IS_WINDOWS: return _win32_monitors()
+        if self.tk_root is not None: return [Monitor(0, 0, self.tk_root.winfo_screenwidth(), self.tk_root.winfo_screenheight())]
+        return [Monitor(0, 0, *ImageGrab.grab().size)]
+
+    def cursor_position(self) -> Tuple[int, int]:
+        if IS_WINDOWS: return _win32_cursor_position()
+        return self.tk_root.winfo_pointerxy() if self.tk_root is not None else (0, 0)
+
+    def grab(self, bbox: Optional[BBox] = None) -> Image.Image:
+        if bbox is None: return ImageGrab.grab(all_screens=True)
+        if IS_WINDOWS and not self.monitors()[0].contains_bbox(bbox): return ImageGrab.grab(bbox, all_screens=True)
+        return ImageGrab.grab(bbox)
+
+
+class MssBackend(CaptureBackend):
+    """mss-based capture: reads only the requested region of the framebuffer"""
+    def __init__(self, tk_root=None):
+        self.tk_root = tk_root
+        self._local = threading.local()  # mss handles must not cross threads
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None: sct = self._local.sct = mss.mss()
+        return sct
+
+    def release_thread(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is not None: self._local.sct = None; sct.close()
+
+    def monitors(self) -> List[Monitor]:
+        return [Monitor(m["left"], m["top"], m["width"], m["height"]) for m in self._sct().monitors[1:]]
+
+    def cursor_position(self) -> Tuple[int, int]:
+        if IS_WINDOWS: return _win32_cursor_position()
+        return self.tk_root.winfo_pointerxy() if self.tk_root is not None else (0, 0)
+
+    def grab(self, bbox: Optional[BBox] = None) -> Image.Image:
+        left, top, right, bottom = bbox or union_bbox(self.monitors())
+        shot = self._sct().grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+        return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+
+class FakeCaptureBackend(CaptureBackend):
+    """Deterministic backend for tests and benchmarks: no display needed.
+
+    Every monitor is a distinct colour with a grid, so crops can be checked
+    by pixel value; every grab is recorded in grabs.
+    """
+    COLORS = ((200, 60, 60), (60, 200, 60), (60, 60, 200), (200, 200, 60))
+
+    def __init__(self, monitors: Optional[List[Monitor]] = None, cursor: Tuple[int, int] = (0, 0)):
+        self._monitors = monitors or [Monitor(0, 0, 1920, 1080)]
+        self.cursor = cursor
+        self.grabs: List[BBox] = []
+
+    def monitors(self) -> List[Monitor]:
+        return list(self._monitors)
+
+    def cursor_position(self) -> Tuple[int, int]:
+        return self.cursor
+
+    def grab(self, bbox: Optional[BBox] = None) -> Image.Image:
+        bbox = bbox or union_bbox(self._monitors)
+        self.grabs.append(bbox)
+        left, top, right, bottom = bbox
+        image = Image.new("RGB", (right - left, bottom - top))
+        draw = ImageDraw.Draw(image)
+        for i, m in enumerate(self._monitors):
+            draw.rectangle((m.x - left, m.y - top, m.x + m.width - left - 1, m.y + m.height - top - 1), fill=self.COLORS[i % len(self.COLORS)])
+        for x in range(-left % 100, image.width, 100): draw.line((x, 0, x, image.height), fill=(255, 255, 255))
+        for y in range(-top % 100, image.height, 100): draw.line((0, y, image.width, y), fill=(255, 255, 255))
+        return image
+
+
+def create_backend(tk_root=None) -> CaptureBackend:
+    return MssBackend(tk_root) if mss is not None else PillowBackend(tk_root)
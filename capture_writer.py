@@ -0,0 +1,110 @@
+# capture_writer.py
+import os
+import datetime
+import threading
+from collections import deque
+from typing import Callable, Collection, Optional, Set
+
+from PIL import Image
+
+from encoders import Encoder, png_encoder
+
+
+def capture_path(directory: str, prefix: str, extension: str, when: Optional[datetime.datetime] = None,
+                 millis: bool = False, taken: Collection[str] = ()) -> str:
+    """Timestamped file name; captures with the same stamp get a counter instead of overwriting each other"""
+    when = when or datetime.datetime.now()
+    stem = os.path.join(directory, f"{prefix}_{when:%Y-%m-%d_%H-%M-%S}" + (f"-{when.microsecond // 1000:03d}" if millis else ""))
+    path, n = stem + extension, 1
+    while path in taken or os.path.exists(path):
+        n += 1; path = f"{stem}_{n}{extension}"
+    return path
+
+
+class CaptureWriter:
+    """Background encode-and-write queue for captured frames.
+
+    submit() only reserves a file name and queues the frame, so the Tk thread
+    (and the capture hotkey) is free again immediately. A worker thread encodes
+    into a temporary file next to the target and renames it into place, so the
+    library never sees a half-written screenshot. on_saved(path) and
+    on_error(path, exc) are called on the Tk thread via master.after. The
+    encoder can be swapped at any time; queued frames keep the one they were
+    submitted with.
+    """
+    PUMP_INTERVAL_MS = 30
+    TEMP_SUFFIX = ".part"
+
+    def __init__(self, master, on_saved: Callable[[str], None], on_error: Callable[[str, Exception], None],
+                 encoder: Optional[Encoder] = None):
+        self.master = master
+        self.on_saved = on_saved
+        self.on_error = on_error
+        self.encoder = encoder or png_encoder()
+        self._cond = threading.Condition()
+        self._queue: deque = deque()
+        self._reserved: Set[str] = set()
+        self._results: deque = deque()
+        self._pump_id = None
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, image: Image.Image, directory: str, prefix: str = "screenshot",
+               captured_at: Optional[datetime.datetime] = None, millis: bool = False) -> str:
+        """Queue image for writing into directory and return the path it will get.
+
+        millis adds milliseconds to the name, for frames taken faster than once a second.
+        """
+        encoder = self.encoder
+        path = self._reserve(directory, prefix, encoder.extension, captured_at or datetime.datetime.now(), millis)
+        with self._cond:
+            self._queue.append((image, path, encoder)); self._cond.notify()
+        self._schedule_pump()
+        return path
+
+    @property
+    def pending(self) -> int:
+        """Frames queued but not yet being encoded"""
+        return len(self._queue)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued capture is on disk (call before exiting)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._reserved, timeout)
+
+    def _reserve(self, directory: str, prefix: str, extension: str, when: datetime.datetime, millis: bool) -> str:
+        with self._cond:
+            path = capture_path(directory, prefix, extension, when, millis, self._reserved)
+            self._reserved.add(path)
+        return path
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue: self._cond.wait()
+                image, path, encoder = self._queue.popleft()
+            tmp = path + self.TEMP_SUFFIX
+            try:
+                with open(tmp, "wb") as f: encoder.save(image, f)
+                os.replace(tmp, path); error = None
+            except Exception as e:
+                error = e
+                try: os.remove(tmp)
+                except OSError: pass
+            self._results.append((path, error))
+            with self._cond:
+                self._reserved.discard(path); self._cond.notify_all()
+
+    def _schedule_pump(self):
+        if self._pump_id is None:
+            self._pump_id = self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+
+    def _pump(self):
+        self._pump_id = None
+        while self._results:
+            path, error = self._results.popleft()
+            try:
+                if error is None: self.on_saved(path)
+                else: self.on_error(path, error)
+            except Exception as e: print(f"Failed to report capture {path}: {e}")
+        with self._cond: busy = bool(self._queue or self._reserved)
+        if busy or self._results: self._schedule_pump()
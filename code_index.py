@@ -0,0 +1,92 @@
+# code_index.py
+import os
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, NamedTuple, Optional
+
+from library_index import LibraryIndex
+import qr_scan
+
+
+class CodeIndexStats(NamedTuple):
+    scanned: int     # files decoded in this run
+    with_codes: int  # of which contained at least one code
+    unchanged: int   # already scanned at their current mtime/size, not opened
+    failed: int
+    cancelled: bool
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        """Images per second over the files actually scanned"""
+        return (self.scanned + self.failed) / self.seconds if self.seconds else 0.0
+
+
+class CodeIndexer:
+    """Scans the library for QR codes and barcodes in a process pool and stores
+    the payloads in the LibraryIndex, so screenshots can be found by the URL
+    or text they contain.
+
+    Incremental: only files whose (name, mtime, size) has no code_scans row are
+    decoded. At most a few files per worker are in flight, results are
+    written in batches, and cancel() stops submitting new files. With a
+    master, on_progress(done, total) and on_finish(CodeIndexStats or None,
+    error) run on the Tk thread; run() does the same work synchronously and
+    returns the stats.
+    """
+    PUMP_INTERVAL_MS = 100
+    BATCH = 32
+    IN_FLIGHT_PER_WORKER = 4
+
+    def __init__(self, index: LibraryIndex, master=None, on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_finish: Optional[Callable[[Optional[CodeIndexStats], Optional[Exception]], None]] = None, workers: Optional[int] = None):
+        self.index = index
+        self.master = master
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)  # leave a core for the UI
+        self._cancel = threading.Event()
+        self._done = self._total = 0
+        self._result = None  # (stats, error) once run() has ended
+
+    def start(self):
+        def work():
+            try: self._result = (self.run(), None)
+            except Exception as e: self._result = (None, e)
+        threading.Thread(target=work, daemon=True).start()
+        self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self) -> CodeIndexStats:
+        if qr_scan.zbar_decode is None: raise RuntimeError("zbar library not found, QR scanning is unavailable")
+        t0 = time.perf_counter()
+        pending_entries = self.index.unscanned_for_codes()
+        unchanged = len(self.index.entries()) - len(pending_entries)
+        self._total = len(pending_entries)
+        scanned = with_codes = failed = 0; batch = []
+        todo = iter(pending_entries); in_flight = {}
+        limit = self.workers * self.IN_FLIGHT_PER_WORKER
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                while not self._cancel.is_set() and len(in_flight) < limit:
+                    entry = next(todo, None)
+                    if entry is None: break
+                    in_flight[pool.submit(qr_scan.scan_file, entry.path)] = entry
+                if not in_flight: break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    entry = in_flight.pop(future); self._done += 1
+                    try: codes = future.result()
+                    except Exception as e: failed += 1; print(f"Failed to scan {entry.path}: {e}"); continue
+                    scanned += 1; with_codes += bool(codes); batch.append((entry, codes))
+                if len(batch) >= self.BATCH: self.index.store_codes(batch); batch = []
+        if batch: self.index.store_codes(batch)
+        return CodeIndexStats(scanned, with_codes, unchanged, failed, self._cancel.is_set(), time.perf_counter() - t0)
+
+    def _pump(self):
+        if self.on_progress: self.on_progress(self._done, self._total)
+        if self._result is None: self.master.after(self.PUMP_INTERVAL_MS, self._pump); return
+        if self.on_finish: self.on_finish(*self._result)
@@ -0,0 +1,127 @@
+# edges.py
+import time
+import threading
+from bisect import bisect_left
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+
+def _positions(data: bytes, start: int, stop: int, base: int) -> List[int]:
+    """Offsets (relative to base) of the 1 bytes in data[start:stop], found with bytes.find"""
+    out = []; i = data.find(b"\x01", start, stop)
+    while i != -1:
+        out.append(i - base); i = data.find(b"\x01", i + 1, stop)
+    return out
+
+
+def _strip_hits(mask: Image.Image, band: int, hit: List[int], across_x: bool) -> bytes:
+    """0/1 per strip and position: mask averaged over strips of exactly band pixels
+    (only the last may be shorter), so strip i covers [i * band, (i + 1) * band)
+    just like the lookups assume. Strips run across y, or across x when
+    across_x, one output row per strip."""
+    w, h = mask.size; length = w if across_x else h
+    full = length // band; parts = []
+    for start, stop, count in ((0, full * band, full), (full * band, length, 1)):
+        if stop <= start: continue
+        if across_x: parts.append(mask.resize((count, h), Image.Resampling.BOX, box=(start, 0, stop, h)).transpose(Image.Transpose.TRANSPOSE))
+        else: parts.append(mask.resize((w, count), Image.Resampling.BOX, box=(0, start, w, stop)))
+    return b"".join(part.point(hit).tobytes() for part in parts)
+
+
+def _nearest(values: List[int], v: int, radius: int) -> Optional[int]:
+    i = bisect_left(values, v)
+    best = None
+    for j in (i - 1, i):
+        if 0 <= j < len(values) and abs(values[j] - v) <= radius and (best is None or abs(values[j] - v) < abs(best - v)):
+            best = values[j]
+    return best
+
+
+class EdgeMap:
+    """UI boundaries of a screenshot, indexed for snapping.
+
+    Built from neighbour-pixel contrast of the grayscale image, all in Pillow's
+    C code: a difference image per axis, a threshold LUT, then a BOX resize
+    that turns the edge mask into projections over BAND-pixel strips. Whole
+    strips and the short last one are resized separately, so strip i covers
+    exactly [i * BAND, (i + 1) * BAND) as the lookups assume. A column x
+    counts as a vertical boundary within a horizontal strip when at least
+    COVERAGE of the strip's rows have an edge there (and likewise for rows),
+    so boundaries are local: a 20 px button edge registers in its own strip,
+    not against the whole screen height. Each strip keeps a sorted list of
+    positions, so a lookup is a bisect in the strips within radius of the
+    cursor (at most three).
+
+    Positions are pixel boundaries: x means "between column x-1 and x".
+    """
+    BAND = 32
+    CONTRAST = 24    # grey levels between neighbours that count as an edge
+    COVERAGE = 0.375 # 12 px of a 32 px strip: shorter than a button edge, taller than text strokes
+
+    def __init__(self, size: Tuple[int, int], band: int, columns: List[List[int]], rows: List[List[int]]):
+        self.size = size
+        self.band = band
+        self.columns = columns  # per horizontal strip: sorted x of vertical boundaries
+        self.rows = rows        # per vertical strip: sorted y of horizontal boundaries
+
+    @classmethod
+    def build(cls, image: Image.Image, band: Optional[int] = None) -> "EdgeMap":
+        band = band or cls.BAND
+        gray = image.convert("L"); w, h = gray.size
+        if w < 2 or h < 2: return cls((w, h), band, [[]], [[]])
+        edge = [0] * cls.CONTRAST + [255] * (256 - cls.CONTRAST)
+        level = round(255 * cls.COVERAGE); hit = [0] * level + [1] * (256 - level)
+        # |p(x) - p(x-1)|, stored at x-1: a boundary at x
+        dx = ImageChops.difference(gray.crop((1, 0, w, h)), gray.crop((0, 0, w - 1, h))).point(edge)
+        dy = ImageChops.difference(gray.crop((0, 1, w, h)), gray.crop((0, 0, w, h - 1))).point(edge)
+        strips_y, strips_x = -(-h // band), -(-w // band)
+        col_hits = _strip_hits(dx, band, hit, across_x=False)
+        row_hits = _strip_hits(dy, band, hit, across_x=True)
+        columns = [_positions(col_hits, s * (w - 1), (s + 1) * (w - 1), base=s * (w - 1) - 1) for s in range(strips_y)]
+        rows = [_positions(row_hits, s * (h - 1), (s + 1) * (h - 1), base=s * (h - 1) - 1) for s in range(strips_x)]
+        return cls((w, h), band, columns, rows)
+
+    def _snap(self, strips: List[List[int]], v: int, across: int, radius: int) -> int:
+        """v moved onto the nearest boundary within radius, looking in the strips that
+        [across - radius, across + radius] falls into"""
+        last = len(strips) - 1
+        indexes = {min(last, max(0, a // self.band)) for a in (across - radius, across, across + radius)}
+        found = [f for f in (_nearest(strips[i], v, radius) for i in indexes) if f is not None]
+        return min(found, key=lambda f: abs(f - v)) if found else v
+
+    def snap_x(self, x: int, y: int, radius: int) -> int:
+        """x moved onto the nearest vertical boundary near (x, y)"""
+        return self._snap(self.columns, x, y, radius)
+
+    def snap_y(self, y: int, x: int, radius: int) -> int:
+        return self._snap(self.rows, y, x, radius)
+
+    def snap(self, x: int, y: int, radius: int) -> Tuple[int, int]:
+        return self.snap_x(x, y, radius), self.snap_y(y, x, radius)
+
+
+class EdgeMapBuilder:
+    """Builds an EdgeMap on a background thread; result is None until it is ready.
+
+    Only the latest start() counts: a build that finishes after a newer one
+    started (or after cancel()) is discarded.
+    """
+    def __init__(self, build: Callable[[Image.Image], EdgeMap] = EdgeMap.build):
+        self._build = build
+        self._generation = 0
+        self.result: Optional[EdgeMap] = None
+        self.seconds = 0.0
+
+    def start(self, image: Image.Image):
+        self._generation += 1; self.result = None
+        threading.Thread(target=self._run, args=(image, self._generation), daemon=True).start()
+
+    def cancel(self):
+        self._generation += 1; self.result = None
+
+    def _run(self, image: Image.Image, generation: int):
+        t0 = time.perf_counter()
+        try: edges = self._build(image)
+        except Exception as e: print(f"Edge map failed: {e}"); return
+        if generation == self._generation: self.result = edges; self.seconds = time.perf_counter() - t0
@@ -0,0 +1,57 @@
+# encoders.py
+from typing import Dict, NamedTuple
+
+from PIL import Image, features
+
+FORMATS = ("png", "webp", "jpeg")
+PROFILES = ("fastest", "balanced", "smallest")
+
+
+class Encoder(NamedTuple):
+    format: str          # Pillow format name
+    extension: str
+    options: Dict[str, object]
+
+    def save(self, image: Image.Image, fp):
+        # Captures come in as RGB; convert() would copy the whole frame even when nothing changes
+        if self.format == "JPEG" and image.mode != "RGB": image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"): image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        image.save(fp, self.format, **self.options)
+
+
+def png_encoder(compress_level: int = 6, optimize: bool = False) -> Encoder:
+    # optimize makes zlib search harder on top of compress_level 9
+    return Encoder("PNG", ".png", {"compress_level": compress_level, "optimize": optimize})
+
+
+def webp_lossless_encoder(method: int = 4, effort: int = 80) -> Encoder:
+    # For lossless WebP "quality" is the compression effort, not a fidelity setting
+    return Encoder("WEBP", ".webp", {"lossless": True, "method": method, "quality": effort})
+
+
+def jpeg_encoder(quality: int = 90, optimize: bool = False, progressive: bool = False) -> Encoder:
+    # 4:4:4 keeps coloured UI text sharp; the usual 4:2:0 smears it
+    return Encoder("JPEG", ".jpg", {"quality": quality, "optimize": optimize, "progressive": progressive, "subsampling": 0})
+
+
+def make_encoder(image_format: str = "png", profile: str = "balanced", png_compress_level: int = 6,
+                 png_optimize: bool = False, jpeg_quality: int = 90) -> Encoder:
+    """Encoder for a format/profile pair.
+
+    "balanced" uses the explicit PNG/JPEG options; "fastest" and "smallest"
+    override them with the cheapest and the tightest settings of the format.
+    WebP falls back to PNG when Pillow was built without libwebp.
+    """
+    fmt = image_format.lower().replace("jpg", "jpeg")
+    if fmt == "webp" and not features.check("webp"): fmt = "png"
+    if fmt == "webp":
+        return {"fastest": webp_lossless_encoder(0, 0), "smallest": webp_lossless_encoder(6, 100)}.get(profile, webp_lossless_encoder())
+    if fmt == "jpeg":
+        return {"fastest": jpeg_encoder(jpeg_quality), "smallest": jpeg_encoder(jpeg_quality, True, True)}.get(profile, jpeg_encoder(jpeg_quality, True))
+    return {"fastest": png_encoder(1), "smallest": png_encoder(9, True)}.get(profile, png_encoder(png_compress_level, png_optimize))
+
+
+def encoder_from_settings(settings: dict) -> Encoder:
+    return make_encoder(settings.get("image_format", "png"), settings.get("encoder_profile", "balanced"),
+                        int(settings.get("png_compress_level", 6)), bool(settings.get("png_optimize", False)),
+                        int(settings.get("jpeg_quality", 90)))
@@ -6,4 +6,5 @@ class SelectionAction(Enum):
     COPY = auto()
     UPLOAD = auto()
     SCAN_QR = auto()
+    RECORD = auto()
     CANCEL = auto()
\ No newline at end of file
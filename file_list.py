@@ -0,0 +1,308 @@
+# file_list.py
+import tkinter as tk
+from tkinter import ttk
+from itertools import count
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Tk event.state modifier masks
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+
+class VirtualFileList(ttk.Frame):
+    """Virtualized file list: a drop-in for the subset of ttk.Treeview the app uses.
+
+    Only rows inside the viewport get canvas items, and that small pool is reused
+    while scrolling, so the Tk item count stays constant however many files the
+    folder holds. Images are kept only for rows in the "window" (viewport plus
+    overscan); viewport_command(visible_ids, window_ids) tells the owner which
+    rows need thumbnails. Selection semantics follow selectmode='extended' and
+    <<TreeviewSelect>> is generated on every change, like the real Treeview.
+
+    bind() attaches to the inner canvas, which holds keyboard focus; the
+    widget's own handlers live on a separate bindtag and run after them.
+    """
+    def __init__(self, master, headings: Sequence[str] = ("", ""), row_height: int = 45, thumb_width: int = 70,
+                 overscan: int = 10, placeholder=None,
+                 viewport_command: Optional[Callable[[List[str], List[str]], None]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.thumb_width = thumb_width
+        self.overscan = overscan
+        self.placeholder = placeholder
+        self.viewport_command = viewport_command
+        self.yscrollcommand: Optional[Callable[[float, float], None]] = None
+
+        self._ids = count()
+        self._items: List[str] = []
+        self._rows: Dict[str, list] = {}  # item -> [values, image]
+        self._index: Optional[Dict[str, int]] = None
+        self._selection: Dict[str, None] = {}
+        self._anchor: Optional[str] = None
+        self._focus: Optional[str] = None
+        self._top = 0
+        self._width = self._height = 1
+        self._pool: List[Tuple[int, int, int]] = []
+        self._window: List[str] = []
+        self._colors: Optional[dict] = None
+        self._redraw_id = None
+        self._select_event_id = None
+
+        header = ttk.Frame(self, style="Header.TFrame"); header.pack(side="top", fill="x")
+        ttk.Label(header, text=headings[0], style="Header.TLabel", width=8, anchor="center").pack(side="left", padx=(0, 4), pady=4)
+        ttk.Label(header, text=headings[1], style="Header.TLabel", anchor="w").pack(side="left", fill="x", expand=True, pady=4)
+        self.canvas = tk.Canvas(self, highlightthickness=0, bd=0, takefocus=1)
+        self.canvas.pack(side="top", fill="both", expand=True)
+
+        tag = f"VirtualFileList{id(self)}"
+        tags = list(self.canvas.bindtags()); tags.insert(1, tag); self.canvas.bindtags(tuple(tags))
+        self.canvas.bind_class(tag, "<Configure>", lambda e: self._schedule_redraw())
+        self.canvas.bind_class(tag, "<ButtonPress-1>", self._on_click)
+        self.canvas.bind_class(tag, "<MouseWheel>", lambda e: self._scroll_rows(-3 if e.delta > 0 else 3))
+        self.canvas.bind_class(tag, "<Button-4>", lambda e: self._scroll_rows(-3))
+        self.canvas.bind_class(tag, "<Button-5>", lambda e: self._scroll_rows(3))
+        self.canvas.bind_class(tag, "<Up>", lambda e: self._move_focus(e, -1))
+        self.canvas.bind_class(tag, "<Down>", lambda e: self._move_focus(e, 1))
+        self.canvas.bind_class(tag, "<Prior>", lambda e: self._move_focus(e, -self._page_rows()))
+        self.canvas.bind_class(tag, "<Next>", lambda e: self._move_focus(e, self._page_rows()))
+        self.canvas.bind_class(tag, "<Home>", lambda e: self._move_focus(e, -len(self._items)))
+        self.canvas.bind_class(tag, "<End>", lambda e: self._move_focus(e, len(self._items)))
+
+    # --- Treeview-compatible API ---
+    def bind(self, sequence=None, func=None, add=None):
+        return self.canvas.bind(sequence, func, add)
+
+    def insert(self, parent, index, image=None, values=()) -> str:
+        item = f"I{next(self._ids):X}"
+        self._rows[item] = [tuple(values), None]
+        if index == "end" or index >= len(self._items): self._items.append(item)
+        else: self._items.insert(index, item)
+        if self._index is not None:
+            if self._items[-1] == item: self._index[item] = len(self._items) - 1
+            else: self._index = None
+        if image is not None: self._rows[item][1] = image
+        self._schedule_redraw()
+        return item
+
+    def delete(self, *items):
+        doomed = set(items)
+        if not doomed: return
+        if len(doomed) >= len(self._items) and doomed.issuperset(self._items): self._items = []
+        else: self._items = [i for i in self._items if i not in doomed]
+        for i in doomed: self._rows.pop(i, None)
+        self._index = None
+        if any(i in self._selection for i in doomed):
+            for i in doomed: self._selection.pop(i, None)
+            self._emit_select()
+        if self._anchor in doomed: self._anchor = None
+        if self._focus in doomed: self._focus = None
+        self._schedule_redraw()
+
+    def exists(self, item) -> bool:
+        return item in self._rows
+
+    def get_children(self, item="") -> Tuple[str, ...]:
+        return tuple(self._items)
+
+    def index(self, item) -> int:
+        if self._index is None: self._index = {i: n for n, i in enumerate(self._items)}
+        return self._index[item]
+
+    def item(self, item, option=None, **kw):
+        row = self._rows[item]
+        if kw:
+            if "values" in kw: row[0] = tuple(kw["values"])
+            if "image" in kw: row[1] = kw["image"] or None
+            if item in self._window: self._schedule_redraw()
+            return None
+        info = {"values": row[0], "image": row[1] or ""}
+        return info[option] if option else info
+
+    def selection(self) -> Tuple[str, ...]:
+        return tuple(sorted(self._selection, key=self.index))
+
+    def selection_set(self, *items):
+        self._update_selection(dict.fromkeys(self._flatten(items)))
+
+    def selection_add(self, *items):
+        new = [i for i in self._flatten(items) if i not in self._selection]
+        if new: self._update_selection({**self._selection, **dict.fromkeys(new)})
+
+    def selection_remove(self, *items):
+        gone = {i for i in self._flatten(items) if i in self._selection}
+        if gone: self._update_selection({i: None for i in self._selection if i not in gone})
+
+    def selection_update(self, add=(), remove=()):
+        """Apply a selection delta in place, O(len(add) + len(remove)) instead of O(selection)"""
+        changed = False
+        for i in remove:
+            if i in self._selection: del self._selection[i]; changed = True
+        for i in add:
+            if i in self._rows and i not in self._selection: self._selection[i] = None; changed = True
+        if changed: self._emit_select(); self._schedule_redraw()
+
+    def focus(self, item=None):
+        if item is None: return self._focus or ""
+        self._focus = item if item in self._rows else None
+
+    def see(self, item):
+        top = self.index(item) * self.row_height
+        height = self._height
+        if top < self._top: self._top = top
+        elif top + self.row_height > self._top + height: self._top = top + self.row_height - height
+        else: return
+        self._schedule_redraw()
+
+    def identify_row(self, y) -> str:
+        index = (int(y) + self._top) // self.row_height
+        return self._items[index] if 0 <= index < len(self._items) and y >= 0 else ""
+
+    def content_y(self, y) -> int:
+        """Viewport y -> y in the scrolled content, like Canvas.canvasy"""
+        return int(y) + self._top
+
+    def rows_between(self, y0, y1) -> Tuple[int, int]:
+        """Half-open index range of the rows touched by the content-space span y0..y1"""
+        lo, hi = sorted((y0, y1))
+        if hi <= lo: return 0, 0
+        first = max(0, lo // self.row_height)
+        last = min(len(self._items), (hi - 1) // self.row_height + 1)
+        return first, max(first, last)
+
+    def children_slice(self, start: int, stop: int) -> List[str]:
+        return self._items[start:stop]
+
+    def bbox(self, item, column=None):
+        if item not in self._rows: return ""
+        y = self.index(item) * self.row_height - self._top
+        if y + self.row_height <= 0 or y >= self._height: return ""
+        return (0, y, self._width, self.row_height)
+
+    def yview(self, *args):
+        total = max(1, len(self._items) * self.row_height)
+        if not args:
+            return (self._top / total, min(1.0, (self._top + self._height) / total))
+        if args[0] == "moveto": self._top = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self.row_height if args[2] == "units" else self._page_rows() * self.row_height
+            self._top += int(args[1]) * step
+        self._schedule_redraw()
+
+    def in_window(self, item) -> bool:
+        """True if item is in the viewport or its overscan, i.e. may hold an image"""
+        return item in self._window
+
+    def refresh_style(self):
+        """Re-read colors from the Treeview style (after a theme change)"""
+        self._colors = None; self._schedule_redraw()
+
+    # --- internals ---
+    @staticmethod
+    def _flatten(items) -> List[str]:
+        if len(items) == 1 and isinstance(items[0], (list, tuple)): return list(items[0])
+        return list(items)
+
+    def _update_selection(self, new: Dict[str, None]):
+        new = {i: None for i in new if i in self._rows}
+        if new.keys() == self._selection.keys(): return
+        self._selection = new
+        self._emit_select(); self._schedule_redraw()
+
+    def _emit_select(self):
+        if self._select_event_id is None:
+            self._select_event_id = self.after_idle(self._fire_select)
+
+    def _fire_select(self):
+        self._select_event_id = None
+        try: self.canvas.event_generate("<<TreeviewSelect>>")
+        except tk.TclError: pass
+
+    def _page_rows(self) -> int:
+        return max(1, self._height // self.row_height - 1)
+
+    def _scroll_rows(self, rows: int):
+        self._top += rows * self.row_height; self._schedule_redraw()
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        item = self.identify_row(event.y)
+        if not item: return
+        if event.state & CONTROL_MASK:
+            if item in self._selection: self.selection_remove(item)
+            else: self.selection_add(item)
+            self._anchor = item
+        elif event.state & SHIFT_MASK and self._anchor in self._rows:
+            self._select_range(self._anchor, item)
+        else:
+            self.selection_set(item); self._anchor = item
+        self._focus = item
+
+    def _select_range(self, a: str, b: str):
+        lo, hi = sorted((self.index(a), self.index(b)))
+        self.selection_set(self._items[lo:hi + 1])
+
+    def _move_focus(self, event, delta: int):
+        if not self._items: return "break"
+        current = self.index(self._focus) if self._focus in self._rows else -1
+        target = max(0, min(len(self._items) - 1, current + delta if current >= 0 else 0))
+        item = self._items[target]
+        if event.state & SHIFT_MASK and self._anchor in self._rows: self._select_range(self._anchor, item)
+        else: self.selection_set(item); self._anchor = item
+        self._focus = item; self.see(item)
+        return "break"
+
+    def _refresh_colors(self):
+        style = ttk.Style(self)
+        self._colors = {
+            "bg": style.lookup("Treeview", "background") or "white",
+            "fg": style.lookup("Treeview", "foreground") or "black",
+            "select_bg": style.lookup("Treeview", "background", ("selected",)) or "#007ACC",
+            "select_fg": style.lookup("Treeview", "foreground", ("selected",)) or "white",
+            "font": style.lookup(".", "font") or ("Arial", 10),
+        }
+        self.canvas.config(bg=self._colors["bg"])
+        for bg, img, text in self._pool: self.canvas.itemconfigure(text, font=self._colors["font"])
+
+    def _schedule_redraw(self):
+        if self._redraw_id is None:
+            self._redraw_id = self.after_idle(self._redraw)
+
+    def _redraw(self):
+        self._redraw_id = None
+        if self._colors is None: self._refresh_colors()
+        c, colors, rh = self.canvas, self._colors, self.row_height
+        self._width, self._height = width, height = c.winfo_width(), c.winfo_height()
+        n = len(self._items)
+        self._top = max(0, min(self._top, n * rh - height))
+        first = self._top // rh
+        slots = height // rh + 2
+        while len(self._pool) < slots:
+            self._pool.append((c.create_rectangle(0, 0, 0, 0, outline="", state="hidden"),
+                               c.create_image(0, 0, anchor="center", state="hidden"),
+                               c.create_text(0, 0, anchor="w", font=colors["font"], state="hidden")))
+        for k, (bg, img, text) in enumerate(self._pool):
+            i = first + k
+            if k >= slots or i >= n:
+                for cid in (bg, img, text): c.itemconfigure(cid, state="hidden")
+                continue
+            item = self._items[i]; values, image = self._rows[item]
+            selected = item in self._selection
+            y = i * rh - self._top
+            c.coords(bg, 0, y, width, y + rh)
+            c.itemconfigure(bg, fill=colors["select_bg"] if selected else colors["bg"], state="normal")
+            c.coords(img, self.thumb_width // 2, y + rh // 2)
+            c.itemconfigure(img, image=image or self.placeholder or "", state="normal")
+            c.coords(text, self.thumb_width + 6, y + rh // 2)
+            c.itemconfigure(text, text=values[0] if values else "", fill=colors["select_fg"] if selected else colors["fg"], state="normal")
+        if self.yscrollcommand: self.yscrollcommand(*self.yview())
+        self._update_window(first, min(n, first + slots))
+
+    def _update_window(self, first: int, last: int):
+        window = self._items[max(0, first - self.overscan):last + self.overscan]
+        if window == self._window: return
+        # Rows that left the window give up their images so memory stays flat
+        keep = set(window)
+        for item in self._window:
+            if item not in keep and item in self._rows: self._rows[item][1] = None
+        self._window = window
+        if self.viewport_command: self.viewport_command(self._items[first:last], window)
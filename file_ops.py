@@ -0,0 +1,135 @@
+# file_ops.py
+import os
+import sys
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+IS_LINUX = sys.platform.startswith("linux")
+
+FICLONE = 0x40049409  # linux/fs.h: share extents with the source (btrfs, XFS, bcachefs)
+KERNEL_COPY_CHUNK = 1 << 30
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    if not IS_LINUX: return False
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd); return True
+    except (ImportError, OSError):
+        return False
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> int:
+    copied = 0
+    while copied < size:
+        n = os.copy_file_range(src_fd, dst_fd, min(KERNEL_COPY_CHUNK, size - copied))
+        if n == 0: break
+        copied += n
+    return copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> int:
+    copied = 0
+    while copied < size:
+        n = os.sendfile(dst_fd, src_fd, copied, min(KERNEL_COPY_CHUNK, size - copied))
+        if n == 0: break
+        copied += n
+    return copied
+
+
+# copy_file_range lets NFS/SMB servers copy without the data crossing the network;
+# sendfile on a regular file target is Linux-only
+KERNEL_COPIES = [(name, fn) for name, fn, ok in (
+    ("copy_file_range", _copy_file_range, hasattr(os, "copy_file_range")),
+    ("sendfile", _sendfile, IS_LINUX and hasattr(os, "sendfile"))) if ok]
+
+
+def copy_file(src: str, dst: str, allow_link: bool = False) -> str:
+    """Copy src to dst with the cheapest primitive that works and return its name.
+
+    Tries a hardlink (only with allow_link, since both names then share one
+    file), a reflink, the kernel copies, and finally a plain buffered copy.
+    """
+    if os.path.abspath(src) == os.path.abspath(dst): raise shutil.SameFileError(f"{src} and {dst} are the same file")
+    if allow_link:
+        try: os.link(src, dst); return "hardlink"
+        except OSError: pass
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        if _reflink(src_fd, dst_fd): method = "reflink"
+        else:
+            size = os.fstat(src_fd).st_size; method = None
+            for name, fn in KERNEL_COPIES:
+                try:
+                    if fn(src_fd, dst_fd, size) == size: method = name; break
+                except OSError: pass
+                # Start over with the next primitive (EXDEV, ENOSYS, unsupported filesystem...)
+                os.lseek(src_fd, 0, os.SEEK_SET); os.lseek(dst_fd, 0, os.SEEK_SET); os.ftruncate(dst_fd, 0)
+            if method is None: shutil.copyfileobj(fsrc, fdst, 1 << 20); method = "copyfileobj"
+    shutil.copymode(src, dst)
+    return method
+
+
+class BulkResult(NamedTuple):
+    done: List[str]
+    failed: List[Tuple[str, str]]  # (path, error)
+    cancelled: bool
+
+
+class BulkFileOperation:
+    """Applies fn(path) to many files on a thread pool.
+
+    on_progress(done, total) and on_finish(BulkResult) run on the Tk thread,
+    delivered by a master.after pump. cancel() lets the files already being
+    processed finish and skips the rest.
+    """
+    PUMP_INTERVAL_MS = 50
+
+    def __init__(self, master, paths: Sequence[str], fn: Callable[[str], object],
+                 on_progress: Callable[[int, int], None], on_finish: Callable[[BulkResult], None], workers: int = 4):
+        self.master = master
+        self.paths = list(paths)
+        self.fn = fn
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.workers = workers
+        self._cancel = threading.Event()
+        self._results: deque = deque()  # (path, error or None, skipped)
+        self._done: List[str] = []
+        self._failed: List[Tuple[str, str]] = []
+        self._processed = 0
+        self._executor = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-file-op")
+        for path in self.paths: self._executor.submit(self._run, path)
+        self._executor.shutdown(wait=False)
+        self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self, path: str):
+        if self._cancel.is_set(): self._results.append((path, None, True)); return
+        try: self.fn(path); self._results.append((path, None, False))
+        except Exception as e: self._results.append((path, str(e), False))
+
+    def _pump(self):
+        while self._results:
+            path, error, skipped = self._results.popleft(); self._processed += 1
+            if skipped: continue
+            if error is None: self._done.append(path)
+            else: self._failed.append((path, error)); print(f"Failed to process {path}: {error}")
+        if self._processed < len(self.paths):
+            self.on_progress(len(self._done) + len(self._failed), len(self.paths))
+            self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+        else:
+            self.on_progress(len(self._done) + len(self._failed), len(self.paths))
+            self.on_finish(BulkResult(self._done, self._failed, self.cancelled))
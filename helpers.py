@@ -4,73 +4,20 @@ from PIL import Image, ImageTk
 import os
 import time
 import math
-import threading
 import functools
 import weakref
-from typing import Dict, Optional, Tuple, Any, Callable
-import gc
+from typing import Optional, Tuple, Any, Callable
+
+from cache import LRUCache
+from thumbnails import decode_reduced, REDUCE_HEADROOM
 
 # Create absolute path to icons directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-class IconCache:
-    """Thread-safe icon cache with memory management and automatic cleanup"""
-    def __init__(self, max_size: int = 100):
-        self.cache: Dict[str, ImageTk.PhotoImage] = {}
-        self.access_times: Dict[str, float] = {}
-        self.max_size = max_size
-        self._lock = threading.RLock()
-        
-    def get(self, key: str, loader_func: Callable[[], ImageTk.PhotoImage]) -> ImageTk.PhotoImage:
-        """Get icon from cache or load if not present"""
-        with self._lock:
-            current_time = time.time()
-            
-            if key in self.cache:
-                self.access_times[key] = current_time
-                return self.cache[key]
-            
-            # Load new icon
-            try:
-                icon = loader_func()
-                self.cache[key] = icon
-                self.access_times[key] = current_time
-                
-                # Cleanup old entries if cache is full
-                if len(self.cache) > self.max_size:
-                    self._cleanup_old_entries()
-                    
-                return icon
-            except Exception as e:
-                print(f"Failed to load icon {key}: {e}")
-                # Return empty transparent image as fallback
-                return ImageTk.PhotoImage(Image.new('RGBA', (24, 24), (0, 0, 0, 0)))
-    
-    def _cleanup_old_entries(self):
-        """Remove least recently used entries"""
-        if len(self.cache) <= self.max_size * 0.8:
-            return
-            
-        # Sort by access time and remove oldest
-        sorted_items = sorted(self.access_times.items(), key=lambda x: x[1])
-        to_remove = len(sorted_items) - int(self.max_size * 0.7)
-        
-        for key, _ in sorted_items[:to_remove]:
-            self.cache.pop(key, None)
-            self.access_times.pop(key, None)
-            
-        # Force garbage collection
-        gc.collect()
-    
-    def clear(self):
-        """Clear all cached icons"""
-        with self._lock:
-            self.cache.clear()
-            self.access_times.clear()
-            gc.collect()
+# Global icon cache instance; icons are a few KB each, so the budget only guards against runaway theme switching
+ICON_CACHE_BUDGET = 16 * 1024 * 1024
+_icon_cache = LRUCache(ICON_CACHE_BUDGET, name="icons")
 
-# Global icon cache instance
-_icon_cache = IconCache()
 
 class PerformanceAnimator:
     """High-performance animator with easing functions and frame skipping"""
@@ -189,7 +136,7 @@ def load_icon_optimized(icon_name: str, theme_name: str, size: Tuple[int, int] =
             print(f"Failed to load icon {icon_name}: {e}")
             return ImageTk.PhotoImage(Image.new('RGBA', size, (0, 0, 0, 0)))
     
-    return _icon_cache.get(cache_key, loader)
+    return _icon_cache.get_or_load(cache_key, loader)
 
 # Backward compatibility
 load_icon = load_icon_optimized
@@ -345,22 +292,6 @@ Tooltip = EnhancedTooltip
 class MemoryManager:
     """Memory management utilities for large image operations"""
     
-    @staticmethod
-    def cleanup_thumbnails(thumbnail_cache: Dict[str, Any], max_size: int = 50):
-        """Clean up thumbnail cache when it gets too large"""
-        if len(thumbnail_cache) <= max_size:
-            return
-            
-        # Remove oldest entries (assuming dict maintains insertion order)
-        items_to_remove = len(thumbnail_cache) - max_size
-        keys_to_remove = list(thumbnail_cache.keys())[:items_to_remove]
-        
-        for key in keys_to_remove:
-            thumbnail_cache.pop(key, None)
-            
-        # Force garbage collection
-        gc.collect()
-        
     @staticmethod
     def optimize_image_for_display(image: Image.Image, max_size: Tuple[int, int] = (800, 600)) -> Image.Image:
         """Optimize image for display while maintaining quality"""
@@ -369,18 +300,18 @@ class MemoryManager:
             
         # Calculate optimal size maintaining aspect ratio
         ratio = min(max_size[0] / image.width, max_size[1] / image.height)
-        new_size = (int(image.width * ratio), int(image.height * ratio))
+        new_size = (max(1, int(image.width * ratio)), max(1, int(image.height * ratio)))
         
-        # Use high-quality resampling
+        # Cheap integer box reduction first, high-quality resampling only for the last step
+        factor = min(image.width // (new_size[0] * REDUCE_HEADROOM), image.height // (new_size[1] * REDUCE_HEADROOM))
+        if factor >= 2 and image.mode in ("L", "RGB", "RGBA"): image = image.reduce(factor)
         return image.resize(new_size, Image.Resampling.LANCZOS)
         
     @staticmethod
     def create_thumbnail_safe(image_path: str, size: Tuple[int, int] = (40, 40)) -> Optional[ImageTk.PhotoImage]:
         """Safely create thumbnail with error handling"""
         try:
-            with Image.open(image_path) as img:
-                img.thumbnail(size, Image.Resampling.LANCZOS)
-                return ImageTk.PhotoImage(img)
+            return ImageTk.PhotoImage(decode_reduced(image_path, size))
         except Exception as e:
             print(f"Thumbnail creation failed for {image_path}: {e}")
             return None
@@ -434,6 +365,57 @@ def debounce(wait_ms: int):
         return debounced
     return decorator
 
+class FrameCoalescer:
+    """Runs callback at most once per display frame, however often request() is called.
+
+    A request after an idle frame runs at once; further requests within the
+    same frame fold into one call at the end of it, so the callback should
+    read the newest state rather than take arguments.
+    """
+    def __init__(self, widget: tk.Misc, callback: Callable[[], None], frame_ms: int = 16):
+        self.widget = widget
+        self.callback = callback
+        self.frame_ms = frame_ms
+        self._job = None
+        self._last = 0.0
+
+    def request(self):
+        if self._job is not None: return
+        wait_ms = self.frame_ms - (time.perf_counter() - self._last) * 1000
+        if wait_ms <= 0: self._run()
+        else: self._job = self.widget.after(int(wait_ms) + 1, self._run)
+
+    def cancel(self):
+        if self._job is not None:
+            try: self.widget.after_cancel(self._job)
+            except tk.TclError: pass
+            self._job = None
+
+    def _run(self):
+        self._job = None; self._last = time.perf_counter()
+        self.callback()
+
+def withdraw_then(window: tk.Misc, callback: Callable[[], None], settle_ms: int = 16, timeout_ms: int = 500):
+    """Withdraw window and run callback once it is really off the screen.
+
+    Waits for the window's own <Unmap> event instead of a fixed delay, then one
+    display frame (settle_ms) so the compositor repaints what was underneath.
+    A window that is not mapped needs no wait; timeout_ms covers a lost event.
+    """
+    if not window.winfo_ismapped():
+        window.withdraw(); window.after_idle(callback); return
+    state = {"done": False}
+    previous = window.bind("<Unmap>")  # unbind(seq, funcid) drops every handler before Python 3.13
+    def on_hidden(event=None):
+        if state["done"] or (event is not None and event.widget is not window): return
+        state["done"] = True
+        window.bind("<Unmap>", previous); window.after_cancel(timer)
+        window.after_idle(window.deletecommand, funcid)  # not from inside the command itself
+        window.after(settle_ms, callback)
+    funcid = window.bind("<Unmap>", on_hidden, add="+")
+    timer = window.after(timeout_ms, on_hidden)
+    window.withdraw()
+
 # Legacy Animator class for backward compatibility
 class Animator(PerformanceAnimator):
     """Legacy animator class - redirects to PerformanceAnimator"""
@@ -0,0 +1,141 @@
+# library.py
+import os
+import stat
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from thumbnails import IMAGE_EXTENSIONS
+
+
+class FileEntry(NamedTuple):
+    name: str
+    path: str
+    mtime_ns: int
+    size: int
+
+    @property
+    def signature(self):
+        return (self.mtime_ns, self.size)
+
+    @property
+    def sort_key(self):
+        """Newest first, ties broken by name"""
+        return (-self.mtime_ns, self.name)
+
+
+class LibraryDiff(NamedTuple):
+    added: List[FileEntry]
+    removed: List[FileEntry]
+    changed: List[FileEntry]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+
+def scan_directory(directory: str) -> Dict[str, FileEntry]:
+    """Snapshot of the screenshots in directory: file name -> FileEntry"""
+    snapshot = {}
+    with os.scandir(directory) as it:
+        for e in it:
+            if not e.name.lower().endswith(IMAGE_EXTENSIONS): continue
+            try:
+                if e.is_file():
+                    st = e.stat(); snapshot[e.name] = FileEntry(e.name, e.path, st.st_mtime_ns, st.st_size)
+            except OSError: continue  # removed between listing and stat
+    return snapshot
+
+
+def diff_snapshots(old: Dict[str, FileEntry], new: Dict[str, FileEntry]) -> LibraryDiff:
+    added = [e for name, e in new.items() if name not in old]
+    removed = [e for name, e in old.items() if name not in new]
+    changed = [e for name, e in new.items() if name in old and old[name].signature != e.signature]
+    return LibraryDiff(added, removed, changed)
+
+
+class LibrarySync:
+    """Tracks the screenshot folder as a scandir snapshot and reports only what changed.
+
+    rescan() diffs synchronously; refresh(names) re-stats just the files the
+    app itself saved or deleted. start() polls the folder on a background
+    thread so files added from outside show up, delivering diffs to on_change
+    on the Tk thread. With an index the last known snapshot is loaded from it
+    and every diff is mirrored into it.
+    """
+    CHECK_INTERVAL_MS = 100
+
+    def __init__(self, master, directory: str, on_change: Callable[[LibraryDiff], None], interval_ms: int = 2000,
+                 index=None):
+        self.master = master
+        self.directory = directory
+        self.on_change = on_change
+        self.interval_ms = interval_ms
+        self.index = index
+        self.snapshot: Dict[str, FileEntry] = index.entries() if index else {}
+        self._version = 0
+        self._scan_result = None
+        self._scan_thread: Optional[threading.Thread] = None
+        self._timer = None
+
+    def entries(self) -> List[FileEntry]:
+        """Current snapshot in list order"""
+        return sorted(self.snapshot.values(), key=lambda e: e.sort_key)
+
+    def rescan(self) -> LibraryDiff:
+        try:
+            new = scan_directory(self.directory)
+        except FileNotFoundError:
+            os.makedirs(self.directory, exist_ok=True); new = {}
+        return self._apply(new)
+
+    def refresh(self, names: Iterable[str]) -> LibraryDiff:
+        """Re-stat only the named files (after the app itself wrote or deleted them), without listing the folder"""
+        added, removed, changed = [], [], []
+        for name in names:
+            old = self.snapshot.get(name); path = os.path.join(self.directory, name)
+            try: st = os.stat(path)
+            except OSError: st = None
+            if st is None or not stat.S_ISREG(st.st_mode) or not name.lower().endswith(IMAGE_EXTENSIONS):
+                if old: removed.append(self.snapshot.pop(name))
+                continue
+            entry = FileEntry(name, path, st.st_mtime_ns, st.st_size); self.snapshot[name] = entry
+            if old is None: added.append(entry)
+            elif old.signature != entry.signature: changed.append(entry)
+        self._version += 1
+        diff = LibraryDiff(added, removed, changed)
+        if self.index and diff: self.index.apply(diff)
+        return diff
+
+    def _apply(self, new: Dict[str, FileEntry]) -> LibraryDiff:
+        diff = diff_snapshots(self.snapshot, new)
+        self.snapshot = new; self._version += 1
+        if self.index and diff: self.index.apply(diff)
+        return diff
+
+    def start(self):
+        if self._timer is None:
+            self._timer = self.master.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._timer is not None:
+            try: self.master.after_cancel(self._timer)
+            except Exception: pass
+            self._timer = None
+        if self.index: self.index.close()
+
+    def _tick(self):
+        if self._scan_thread is None:
+            version = self._version
+            def scan():
+                try: self._scan_result = (version, scan_directory(self.directory))
+                except OSError: self._scan_result = (version, None)
+            self._scan_thread = threading.Thread(target=scan, daemon=True); self._scan_thread.start()
+        elif not self._scan_thread.is_alive():
+            self._scan_thread = None
+            version, new = self._scan_result; self._scan_result = None
+            # A scan that started before a synchronous rescan() may be stale
+            if new is not None and version == self._version:
+                diff = self._apply(new)
+                if diff: self.on_change(diff)
+            self._timer = self.master.after(self.interval_ms, self._tick)
+            return
+        self._timer = self.master.after(self.CHECK_INTERVAL_MS, self._tick)
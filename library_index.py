@@ -0,0 +1,179 @@
+# library_index.py
+import os
+import queue
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from library import FileEntry, LibraryDiff
+
+INDEX_FILE_NAME = ".cappyfox_index.db"
+
+
+class IndexRecord(NamedTuple):
+    name: str
+    mtime_ns: int
+    size: int
+    width: Optional[int]
+    height: Optional[int]
+    format: Optional[str]
+    hash: Optional[str]
+
+
+class CodeRecord(NamedTuple):
+    name: str
+    kind: str  # symbol type as reported by zbar: QRCODE, EAN13, CODE128...
+    data: str
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""): h.update(chunk)
+    return h.hexdigest()
+
+
+def probe_image(path: str) -> Tuple[int, int, str]:
+    """Pixel size and format from the image header, without decoding pixel data"""
+    with Image.open(path) as img:
+        return img.width, img.height, img.format or ""
+
+
+class LibraryIndex:
+    """SQLite metadata index of the screenshot folder, stored next to the library.
+
+    mtime and size are written as soon as a diff arrives; dimensions, format
+    and content hash are filled in by a background thread. Lookups never open
+    image files.
+
+    QR/barcode payloads live in the codes table; code_scans records the
+    mtime/size each file was scanned at, so a batch scan only visits files
+    that are new or changed since (see code_index.CodeIndexer).
+    """
+    def __init__(self, library_dir: str):
+        self.library_dir = library_dir
+        self.db_path = os.path.join(library_dir, INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS screenshots (
+                name TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,
+                width INTEGER, height INTEGER, format TEXT, hash TEXT)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS screenshots_mtime ON screenshots (mtime_ns)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS screenshots_size ON screenshots (size)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS code_scans (name TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS codes (name TEXT NOT NULL, kind TEXT NOT NULL, data TEXT NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS codes_name ON codes (name)")
+        self._probe_queue: "queue.Queue[FileEntry]" = queue.Queue()
+        threading.Thread(target=self._probe_worker, daemon=True).start()
+        # Entries indexed by an earlier session whose probe never finished
+        with self._lock:
+            unprobed = self._db.execute("SELECT name, mtime_ns, size FROM screenshots WHERE hash IS NULL").fetchall()
+        for name, mtime_ns, size in unprobed: self._probe_queue.put(self._entry(name, mtime_ns, size))
+
+    def _entry(self, name: str, mtime_ns: int, size: int) -> FileEntry:
+        return FileEntry(name, os.path.join(self.library_dir, name), mtime_ns, size)
+
+    def entries(self) -> Dict[str, FileEntry]:
+        """The indexed snapshot, usable as LibrarySync's starting point"""
+        with self._lock:
+            rows = self._db.execute("SELECT name, mtime_ns, size FROM screenshots ORDER BY mtime_ns DESC, name").fetchall()
+        return {name: self._entry(name, mtime_ns, size) for name, mtime_ns, size in rows}
+
+    def get(self, name: str) -> Optional[IndexRecord]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM screenshots WHERE name = ?", (name,)).fetchone()
+        return IndexRecord(*row) if row else None
+
+    def apply(self, diff: LibraryDiff):
+        """Mirror a LibrarySync diff; metadata of new/changed files is probed in the background"""
+        if not diff: return
+        upserts = diff.added + diff.changed
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM screenshots WHERE name = ?", [(e.name,) for e in diff.removed])
+            self._db.executemany("DELETE FROM code_scans WHERE name = ?", [(e.name,) for e in diff.removed])
+            self._db.executemany("DELETE FROM codes WHERE name = ?", [(e.name,) for e in diff.removed + diff.changed])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO screenshots (name, mtime_ns, size) VALUES (?, ?, ?)",
+                [(e.name, e.mtime_ns, e.size) for e in upserts])
+        for e in upserts: self._probe_queue.put(e)
+
+    def query(self, mtime_from_ns: Optional[int] = None, mtime_to_ns: Optional[int] = None,
+              min_size: Optional[int] = None, max_size: Optional[int] = None,
+              min_width: Optional[int] = None, min_height: Optional[int] = None,
+              max_width: Optional[int] = None, max_height: Optional[int] = None) -> List[str]:
+        """Names matching all given bounds, newest first"""
+        clauses, params = [], []
+        for column, op, value in (("mtime_ns", ">=", mtime_from_ns), ("mtime_ns", "<", mtime_to_ns),
+                                  ("size", ">=", min_size), ("size", "<=", max_size),
+                                  ("width", ">=", min_width), ("height", ">=", min_height),
+                                  ("width", "<=", max_width), ("height", "<=", max_height)):
+            if value is not None: clauses.append(f"{column} {op} ?"); params.append(value)
+        sql = "SELECT name FROM screenshots" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql + " ORDER BY mtime_ns DESC, name", params)]
+
+    def unscanned_for_codes(self) -> List[FileEntry]:
+        """Files never scanned for codes, or changed since their last scan; newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.name, s.mtime_ns, s.size FROM screenshots s LEFT JOIN code_scans c "
+                "ON c.name = s.name AND c.mtime_ns = s.mtime_ns AND c.size = s.size "
+                "WHERE c.name IS NULL ORDER BY s.mtime_ns DESC, s.name").fetchall()
+        return [self._entry(name, mtime_ns, size) for name, mtime_ns, size in rows]
+
+    def store_codes(self, results: List[Tuple[FileEntry, List[Tuple[str, str]]]]) -> int:
+        """Record scan results [(entry, [(kind, data), ...])] in one transaction.
+        Results for files that changed or vanished meanwhile are dropped; returns how many were stored."""
+        stored = 0
+        with self._lock:
+            if self._closed: return 0
+            with self._db:
+                for entry, codes in results:
+                    current = self._db.execute("SELECT 1 FROM screenshots WHERE name = ? AND mtime_ns = ? AND size = ?",
+                                               (entry.name, entry.mtime_ns, entry.size)).fetchone()
+                    if not current: continue
+                    self._db.execute("DELETE FROM codes WHERE name = ?", (entry.name,))
+                    self._db.executemany("INSERT INTO codes (name, kind, data) VALUES (?, ?, ?)", [(entry.name, k, d) for k, d in codes])
+                    self._db.execute("INSERT OR REPLACE INTO code_scans (name, mtime_ns, size) VALUES (?, ?, ?)",
+                                     (entry.name, entry.mtime_ns, entry.size))
+                    stored += 1
+        return stored
+
+    def reset_codes(self):
+        """Forget all scan results, so the next batch scan decodes every file again"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM code_scans"); self._db.execute("DELETE FROM codes")
+
+    def search_codes(self, text: str) -> List[CodeRecord]:
+        """Codes whose payload contains text (case-insensitive for ASCII), newest screenshots first"""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.name, c.kind, c.data FROM codes c JOIN screenshots s ON s.name = c.name "
+                "WHERE c.data LIKE ? ESCAPE '\\' ORDER BY s.mtime_ns DESC, c.name", (pattern,)).fetchall()
+        return [CodeRecord(*row) for row in rows]
+
+    def _probe_worker(self):
+        while True:
+            entry = self._probe_queue.get()
+            try:
+                width, height, fmt = probe_image(entry.path)
+                digest = file_hash(entry.path)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                print(f"Failed to index {entry.path}: {e}"); continue
+            with self._lock:
+                if self._closed: return
+                # Skip if the file changed again while we were reading it
+                with self._db: self._db.execute(
+                    "UPDATE screenshots SET width = ?, height = ?, format = ?, hash = ? WHERE name = ? AND mtime_ns = ? AND size = ?",
+                    (width, height, fmt, digest, entry.name, entry.mtime_ns, entry.size))
+
+    def close(self):
+        with self._lock:
+            if not self._closed: self._closed = True; self._db.close()
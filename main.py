@@ -1,17 +1,20 @@
 # main.py
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk, ImageGrab
+from PIL import Image, ImageTk
 import os
 import datetime
 import sys
-import shutil
 import threading
+import multiprocessing
 import io
 import json
+import bisect
+import sqlite3
 
+# uploads тянет requests: без него приложение не стартует, а показывает понятное сообщение
 try:
-    import requests
+    from uploads import UploadManager
 except ImportError:
     messagebox.showerror("Отсутствует зависимость", "Библиотека 'requests' не найдена.")
     sys.exit(1)
@@ -19,11 +22,24 @@ except ImportError:
 from constants import APP_NAME, THEMES
 from settings_manager import SettingsManager
 from selection import SimpleSelection
-from helpers import load_icon, Tooltip
+from helpers import load_icon, Tooltip, withdraw_then
+from thumbnails import ThumbnailStore, ThumbnailLoader, THUMBNAIL_SIZE, THUMBNAIL_CACHE_BUDGET
+from library import LibrarySync
+from library_index import LibraryIndex
+from file_list import VirtualFileList
+from preview import PreviewRenderer, PreviewPrefetcher
+from cache import LRUCache
+from file_ops import BulkFileOperation, copy_file
+from capture_writer import CaptureWriter, capture_path
+from recording import RegionRecorder, RECORD_FORMATS
+from encoders import encoder_from_settings
+from capture import create_backend
+from burst import BurstCapture
+from qr_scan import QrScanner
+from code_index import CodeIndexer
 
 from pystray import Icon as PyTrayIcon, MenuItem as PyTrayMenuItem
 import keyboard
-from pyzbar.pyzbar import decode as qr_decode
 
 IS_WINDOWS = sys.platform == "win32"
 if IS_WINDOWS:
@@ -47,16 +63,32 @@ class ScreenshotApp:
         # --- ВОССТАНОВЛЕНО: Путь к файлу истории ---
         self.history_file = "history.json"
 
-        self.tray_icon = None; self.full_screen_hotkey = None; self.area_hotkey = None
+        self.tray_icon = None; self.full_screen_hotkey = None; self.area_hotkey = None; self.burst_hotkey = None
         self.current_image = None; self.current_image_path = None
-        self.thumbnail_cache = {}
+        self.thumbnail_cache = LRUCache(THUMBNAIL_CACHE_BUDGET, name="thumbnails"); self.thumbnail_store = ThumbnailStore(self.screenshot_dir)
+        self.thumbnail_loader = ThumbnailLoader(master, self.thumbnail_store, self._on_thumbnail_ready)
+        self.library = self._create_library()
+        self.capture_writer = CaptureWriter(master, self._on_capture_saved, self._on_capture_failed, encoder_from_settings(self.settings_manager.settings))
+        self.preview_prefetcher = PreviewPrefetcher(LRUCache(self._prefetch_budget(), name="previews")); self._current_pyramid = None
+        self._tree_keys = []; self._rows = {}; self._row_info = {}
+        self._placeholder_thumb = ImageTk.PhotoImage(Image.new('RGBA', THUMBNAIL_SIZE, (128, 128, 128, 60)))
         
         self.selection_rectangle = None; self.drag_start_pos = None
+        self._drag_pos = None; self._drag_job = None; self._drag_base = set(); self._drag_range = (0, 0)
         
+        self.capture_backend = create_backend(master)
+        self.burst = BurstCapture(master, self.capture_backend, self.capture_writer, self._on_burst_finished)
+        self.qr_scanner = QrScanner(master)
+        s = self.settings_manager.settings
+        self.uploads = UploadManager(master, self._on_upload_done, self._on_upload_failed, s["upload_api_url"],
+                                     workers=max(1, int(s["upload_workers"])), max_attempts=max(1, int(s["upload_retries"])))
+        self.uploads.resume()  # незавершённые загрузки прошлого запуска
         self.selection_tool = SimpleSelection(self)
         self._setup_styles(); self.setup_ui()
-        self.load_screenshots()
+        # Список сразу строится из индекса, сверка с папкой — после отрисовки окна
+        self.load_screenshots(rescan=False); self.library.start(); master.after_idle(self.sync_library)
         self._setup_tray_icon(); self.rehook_hotkeys()
+        master.after_idle(self.selection_tool.prewarm)  # оверлей выделения создаётся заранее и ждёт скрытым
         
         if self.settings_manager.settings["start_minimized"]: master.withdraw()
 
@@ -89,6 +121,7 @@ class ScreenshotApp:
         # --- ВОССТАНОВЛЕНО: Кнопка "История" ---
         btn_refresh = ttk.Button(self.control_frame, image=self.icons.get("refresh"), command=self.load_screenshots, style="Cappy.TButton"); btn_refresh.pack(side="right", padx=2, pady=2); Tooltip(btn_refresh, "Обновить")
         btn_history = ttk.Button(self.control_frame, image=self.icons.get("history"), command=self.open_history_window, style="Cappy.TButton"); btn_history.pack(side="right", padx=(10,2), pady=2); Tooltip(btn_history, "История загрузок")
+        btn_codes = ttk.Button(self.control_frame, text="QR", command=self.open_code_search_window, style="Cappy.TButton"); btn_codes.pack(side="right", padx=2, pady=2); Tooltip(btn_codes, "Поиск скриншотов по QR- и штрихкодам")
         btn_settings = ttk.Button(self.control_frame, image=self.icons.get("settings"), command=self.settings_manager.open_settings_window, style="Cappy.TButton"); btn_settings.pack(side="right", padx=(2,2), pady=2); Tooltip(btn_settings, "Настройки")
         
         self.paned_window = ttk.PanedWindow(self.master, orient=tk.HORIZONTAL); self.paned_window.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
@@ -99,11 +132,9 @@ class ScreenshotApp:
         self.btn_multi_export = ttk.Button(header_buttons_frame, text="Экспорт", command=self._export_selected, style="Cappy.TButton"); self.btn_multi_export.pack(side="left", padx=2)
         self.btn_multi_delete = ttk.Button(header_buttons_frame, text="Удалить", command=self._delete_selected, style="Cappy.TButton"); self.btn_multi_delete.pack(side="left", padx=2)
         self.tree_frame = ttk.Frame(self.left_pane); self.tree_frame.pack(fill="both", expand=True)
-        self.tree = ttk.Treeview(self.tree_frame, columns=("filename",), show="tree headings", selectmode='extended')
-        self.tree.heading("#0", text="Превью"); self.tree.heading("filename", text="Имя файла")
-        self.tree.column("#0", width=70, anchor='center', stretch=False); self.tree.column("filename", width=200)
+        self.tree = VirtualFileList(self.tree_frame, headings=("Превью", "Имя файла"), placeholder=self._placeholder_thumb, viewport_command=self._on_tree_viewport)
         scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview, style='Cappy.Vertical.TScrollbar')
-        self.tree.configure(yscrollcommand=scrollbar.set); scrollbar.pack(side="right", fill="y"); self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.yscrollcommand = scrollbar.set; scrollbar.pack(side="right", fill="y"); self.tree.pack(side="left", fill="both", expand=True)
         self.tree.bind("<<TreeviewSelect>>", self.on_screenshot_select)
         self.tree.bind("<Button-3>", self._show_context_menu)
         self.tree.bind("<Control-a>", self._select_all); self.tree.bind("<Control-A>", self._select_all)
@@ -113,6 +144,7 @@ class ScreenshotApp:
         self.right_pane = ttk.Frame(self.paned_window); self.paned_window.add(self.right_pane, weight=3)
         self.right_pane.rowconfigure(0, weight=1); self.right_pane.columnconfigure(0, weight=1)
         self.image_canvas = tk.Canvas(self.right_pane, highlightthickness=0); self.image_canvas.grid(row=0, column=0, sticky="nsew", pady=5); self.image_canvas.bind("<Configure>", self.resize_image_event)
+        self.preview = PreviewRenderer(self.image_canvas)
         bottom_panel = ttk.Frame(self.right_pane); bottom_panel.grid(row=1, column=0, sticky="ew", pady=(0,5))
         self.info_label = ttk.Label(bottom_panel, text="Выберите файл", anchor="w"); self.info_label.pack(side="left", padx=5)
         actions_frame = ttk.Frame(bottom_panel); actions_frame.pack(side="right")
@@ -182,6 +214,61 @@ class ScreenshotApp:
         ttk.Button(btn_frame, text="Удалить", command=delete_selected_entry, style='Cappy.TButton').pack(side="left", expand=True, fill="x", padx=2)
         ttk.Button(btn_frame, text="Очистить все", command=clear_all_history, style='Cappy.TButton').pack(side="left", expand=True, fill="x", padx=2)
         ttk.Button(btn_frame, text="Закрыть", command=hist_win.destroy, style='Cappy.TButton').pack(side="left", expand=True, fill="x", padx=2)
+
+    def open_code_search_window(self):
+        """Поиск скриншотов по содержимому QR- и штрихкодов; сканирование библиотеки идёт в пуле процессов."""
+        index = self.library.index
+        if index is None: return self.show_toast("Индекс библиотеки недоступен")
+        win = tk.Toplevel(self.master); win.title("Поиск по QR-кодам"); win.geometry("600x400"); win.transient(self.master)
+        win.config(bg=THEMES[self.theme_name]["bg"])
+        main_frame = ttk.Frame(win, style="Settings.TFrame"); main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        top = ttk.Frame(main_frame, style="Settings.TFrame"); top.pack(fill="x", pady=(0, 10))
+        query = ttk.Entry(top); query.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        tv_frame = ttk.Frame(main_frame); tv_frame.pack(fill="both", expand=True, pady=(0, 10))
+        tv = ttk.Treeview(tv_frame, columns=("name", "data"), show="headings", selectmode='browse')
+        tv.heading("name", text="Файл"); tv.heading("data", text="Содержимое кода")
+        tv.column("name", width=200); tv.column("data", width=350)
+        scrollbar = ttk.Scrollbar(tv_frame, orient="vertical", command=tv.yview, style='Cappy.Vertical.TScrollbar')
+        tv.configure(yscrollcommand=scrollbar.set); scrollbar.pack(side="right", fill="y"); tv.pack(side="left", fill="both", expand=True)
+        status = ttk.Label(main_frame, text=""); status.pack(fill="x", pady=(0, 10))
+
+        def search(event=None):
+            tv.delete(*tv.get_children())
+            for record in index.search_codes(query.get().strip()): tv.insert("", "end", values=(record.name, record.data))
+        def show_in_library(event=None):
+            if not tv.focus(): return
+            item = self._rows.get(tv.item(tv.focus())['values'][0])
+            if item: self.tree.selection_set(item); self.tree.see(item)
+        query.bind("<Return>", search); tv.bind("<Double-1>", show_in_library)
+        ttk.Button(top, text="Найти", command=search, style='Cappy.TButton').pack(side="left")
+
+        indexer = None
+        def progress(done, total):
+            if win.winfo_exists(): status.config(text=f"Сканирование: {done} / {total}")
+        def finish(stats, error):
+            nonlocal indexer
+            indexer = None
+            if not win.winfo_exists(): return
+            btn_scan.config(state="normal")
+            if error: status.config(text=f"Ошибка сканирования: {error}"); return
+            status.config(text=f"Просканировано {stats.scanned} ({stats.rate:.1f} изобр./с), с кодами: {stats.with_codes}, "
+                               f"без изменений: {stats.unchanged}" + (", ошибок: " + str(stats.failed) if stats.failed else "") + (" — отменено" if stats.cancelled else ""))
+            search()
+        def scan_library():
+            nonlocal indexer
+            if indexer: return
+            btn_scan.config(state="disabled")
+            indexer = CodeIndexer(index, self.master, progress, finish); indexer.start()
+        def close():
+            if indexer: indexer.cancel()
+            win.destroy()
+
+        btn_frame = ttk.Frame(main_frame, style='Settings.TFrame'); btn_frame.pack(fill="x")
+        btn_scan = ttk.Button(btn_frame, text="Сканировать библиотеку", command=scan_library, style='Cappy.TButton'); btn_scan.pack(side="left", expand=True, fill="x", padx=2)
+        ttk.Button(btn_frame, text="Закрыть", command=close, style='Cappy.TButton').pack(side="left", expand=True, fill="x", padx=2)
+        win.protocol("WM_DELETE_WINDOW", close)
+        search(); query.focus_set()
     # --- КОНЕЦ НОВЫХ ФУНКЦИЙ ---
 
     def on_screenshot_select(self, event):
@@ -189,17 +276,26 @@ class ScreenshotApp:
         if selection:
             self.multi_actions_header.pack(side="top", fill="x", pady=(0, 5))
             verb_file = "файл" if len(selection)%10==1 and len(selection)%100!=11 else ("файла" if 2<=len(selection)%10<=4 and (len(selection)%100<10 or len(selection)%100>=20) else "файлов")
-            self.selection_label.config(text=f"Выбрано: {len(selection)} {verb_file}")
+            total = sum(self._row_info[i].size for i in selection if i in self._row_info)
+            total_text = f"{total/1024/1024:.1f} MB" if total >= 1024*1024 else f"{total/1024:.1f} KB"
+            self.selection_label.config(text=f"Выбрано: {len(selection)} {verb_file} ({total_text})")
+            if self.drag_start_pos: return  # превью обновится, когда рамку отпустят
             last_selected_id = selection[-1]; filename = self.tree.item(last_selected_id, 'values')[0]
             filepath = os.path.join(self.screenshot_dir, filename)
             self.current_image_path = filepath
-            if not os.path.exists(filepath): self.load_screenshots(); return
+            # Строка информации берётся из индекса, файл открывается только ради превью
+            record = self.library.index.get(filename) if self.library.index else None
+            entry = self._row_info.get(last_selected_id)
             try:
-                with Image.open(filepath) as img:
-                    self.current_image = img.copy()
-                    self.display_image()
-                    info = f"{filename} | {self.current_image.width}x{self.current_image.height} | {os.path.getsize(filepath)/1024:.1f} KB"
-                    self.info_label.config(text=info)
+                key = (filepath, entry.mtime_ns, entry.size) if entry else (filepath, None, None)
+                self._current_pyramid = self.preview_prefetcher.load(key, filepath)
+                self.current_image = self._current_pyramid.levels[0]
+                self.display_image()
+                if record and record.width: info = f"{filename} | {record.width}x{record.height} | {record.size/1024:.1f} KB"
+                else: info = f"{filename} | {self.current_image.width}x{self.current_image.height} | {entry.size/1024:.1f} KB"
+                self.info_label.config(text=info)
+                self._prefetch_neighbours(last_selected_id)
+            except FileNotFoundError: self.sync_library()
             except Exception as e:
                 self.info_label.config(text=f"Не удалось открыть файл: {e}"); self._clear_preview()
         else:
@@ -207,41 +303,48 @@ class ScreenshotApp:
             self._clear_preview(); self.current_image_path = None
     
     def display_image(self):
-        if not self.current_image: return
-        canvas_w = self.image_canvas.winfo_width(); canvas_h = self.image_canvas.winfo_height()
-        if canvas_w < 10 or canvas_h < 10: self.master.after(50, self.display_image); return
-        img_to_show = self.current_image.copy()
-        img_to_show.thumbnail((canvas_w, canvas_h), Image.Resampling.LANCZOS)
-        self.tk_photo = ImageTk.PhotoImage(img_to_show)
-        self.image_canvas.delete("all"); self.image_canvas.create_image(canvas_w / 2, canvas_h / 2, anchor="center", image=self.tk_photo)
+        if self._current_pyramid: self.preview.show(self._current_pyramid)
+        elif self.current_image: self.preview.show(self.current_image)
     
     def _clear_preview(self):
-        self.current_image = None; self.current_image_path = None
-        self.image_canvas.delete("all"); self.info_label.config(text="Выберите файл")
+        self.current_image = None; self.current_image_path = None; self._current_pyramid = None
+        self.preview.clear(); self.info_label.config(text="Выберите файл")
         
     def _on_mouse_press(self, event):
         if not self.tree.identify_row(event.y):
-            self.drag_start_pos = (event.x, event.y)
-            if not (event.state & 0x0004): self.tree.selection_set([])
+            # Начало рамки хранится в координатах содержимого, чтобы прокрутка во время перетаскивания её не сдвигала
+            self.drag_start_pos = (event.x, self.tree.content_y(event.y))
+            extend = event.state & 0x0004
+            self._drag_base = set(self.tree.selection()) if extend else set(); self._drag_range = (0, 0)
+            if not extend: self.tree.selection_set([])
     
     def _on_mouse_drag(self, event):
         if not self.drag_start_pos: return
+        # Движения мыши схлопываются: за кадр обрабатывается только последнее положение
+        self._drag_pos = (event.x, event.y)
+        if self._drag_job is None: self._drag_job = self.master.after_idle(self._update_rubber_band)
+
+    def _update_rubber_band(self):
+        self._drag_job = None
+        if not self.drag_start_pos: return
+        (x, y0), (ex, ey) = self.drag_start_pos, self._drag_pos
+        y1 = self.tree.content_y(ey); top = y0 - (y1 - ey)
         if not self.selection_rectangle:
             self.selection_rectangle = tk.Frame(self.tree_frame, relief='solid', borderwidth=1, background=self.style.lookup("TCombobox", "selectbackground"))
             self.selection_rectangle.lower(self.tree)
-        x, y = self.drag_start_pos; ex, ey = event.x, event.y
-        self.selection_rectangle.place(x=min(x, ex), y=min(y, ey), width=abs(ex - x), height=abs(ey - y))
-        for item in self.tree.get_children():
-            bbox = self.tree.bbox(item)
-            if not bbox: continue
-            if (min(x, ex) < bbox[0] + bbox[2] and max(x, ex) > bbox[0] and min(y, ey) < bbox[1] + bbox[3] and max(y, ey) > bbox[1]):
-                self.tree.selection_add(item)
-            else:
-                 if not (event.state & 0x0004): self.tree.selection_remove(item)
+        self.selection_rectangle.place(x=min(x, ex), y=min(top, ey), width=abs(ex - x), height=abs(ey - top))
+        # Диапазон строк считается из высоты строки, применяется только разница с прошлым кадром
+        lo, hi = self.tree.rows_between(y0, y1) if ex != x else (0, 0)
+        plo, phi = self._drag_range; self._drag_range = (lo, hi)
+        entered = self.tree.children_slice(lo, min(hi, plo)) + self.tree.children_slice(max(lo, phi), hi)
+        left = self.tree.children_slice(plo, min(phi, lo)) + self.tree.children_slice(max(plo, hi), phi)
+        self.tree.selection_update(add=entered, remove=[i for i in left if i not in self._drag_base])
 
     def _on_mouse_release(self, event):
+        if self._drag_job is not None: self.master.after_cancel(self._drag_job); self._update_rubber_band()
         if self.selection_rectangle: self.selection_rectangle.destroy(); self.selection_rectangle = None
-        self.drag_start_pos = None
+        dragged = self.drag_start_pos is not None; self.drag_start_pos = None
+        if dragged: self.on_screenshot_select(None)
 
     def _select_all(self, event=None):
         self.tree.selection_set(self.tree.get_children()); return "break"
@@ -262,22 +365,48 @@ class ScreenshotApp:
         paths = self._get_selected_paths();
         if not paths: return
         if messagebox.askyesno("Подтверждение", f"Удалить {len(paths)} выбранных файлов?"):
-            for p in paths:
-                try: os.remove(p)
-                except Exception as e: print(f"Failed to delete {p}: {e}")
-            self.load_screenshots()
+            def finish(result):
+                # Список обновляется только по удалённым файлам, без пересканирования папки
+                self._apply_library_diff(self.library.refresh([os.path.basename(p) for p in result.done]))
+                self.show_toast(self._bulk_summary("Удалено", result))
+            self._run_bulk_operation("Удаление", paths, os.remove, finish)
 
     def _export_selected(self):
         paths = self._get_selected_paths();
         if not paths: return
         d = filedialog.askdirectory(title="Выберите папку");
         if not d: return
-        c = sum(1 for p in paths if self._copy_file_safely(p, d))
-        self.show_toast(f"Экспортировано {c} файлов.")
-        
-    def _copy_file_safely(self, src, dst):
-        try: shutil.copy(src, dst); return True
-        except Exception as e: print(f"Failed to copy {src} to {dst}: {e}"); return False
+        allow_link = self.settings_manager.settings["export_hardlinks"]
+        def finish(result):
+            if os.path.normcase(os.path.abspath(d)) == os.path.normcase(os.path.abspath(self.screenshot_dir)):
+                self._apply_library_diff(self.library.refresh([os.path.basename(p) for p in result.done]))
+            self.show_toast(self._bulk_summary("Экспортировано", result))
+        self._run_bulk_operation("Экспорт", paths, lambda p: copy_file(p, os.path.join(d, os.path.basename(p)), allow_link), finish)
+
+    def _run_bulk_operation(self, title, paths, fn, on_finish):
+        """Файловая операция над многими файлами в пуле потоков с окном прогресса и отменой."""
+        win = tk.Toplevel(self.master); win.title(title); win.transient(self.master); win.resizable(False, False)
+        win.withdraw()  # окно показывается, только если операция не закончилась сразу
+        label = ttk.Label(win, text=f"0 / {len(paths)}"); label.pack(padx=20, pady=(15, 5))
+        bar = ttk.Progressbar(win, length=300, maximum=len(paths)); bar.pack(padx=20)
+        def progress(done, total):
+            bar["value"] = done; label.config(text=f"{done} / {total}")
+        def finish(result):
+            win.destroy(); on_finish(result)
+        op = BulkFileOperation(self.master, paths, fn, progress, finish)
+        ttk.Button(win, text="Отмена", command=op.cancel, style='Cappy.TButton').pack(pady=15)
+        win.protocol("WM_DELETE_WINDOW", op.cancel)
+        def reveal():
+            if win.winfo_exists(): win.deiconify()
+        self.master.after(300, reveal)
+        op.start()
+
+    @staticmethod
+    def _bulk_summary(verb, result):
+        text = f"{verb} {len(result.done)} файлов."
+        if result.failed: text += f" Ошибок: {len(result.failed)}."
+        if result.cancelled: text += " Операция отменена."
+        return text
 
     def apply_theme(self, theme_name):
         self.theme_name = theme_name; theme = THEMES.get(theme_name, THEMES["Dark"])
@@ -293,23 +422,105 @@ class ScreenshotApp:
         s.layout("Treeview", [('Treeview.treearea', {'sticky': 'nswe'})])
         s.configure('TPanedWindow', background=theme["bg"]); s.configure('Cappy.Vertical.TScrollbar', gripcount=0, background=theme["button_bg"], darkcolor=theme["control_bg"], lightcolor=theme["control_bg"], troughcolor=theme["bg"], borderwidth=0, relief='flat', arrowcolor=theme["fg"], arrowsize=14, width=14)
         s.map('Cappy.Vertical.TScrollbar', background=[('active', theme["select_bg"])]); self.image_canvas.config(bg=theme["preview_bg"])
+        self.tree.refresh_style()  # список кэширует цвета стиля Treeview, в отличие от настоящего Treeview
 
-    def load_screenshots(self):
-        self.tree.delete(*self.tree.get_children())
-        self.thumbnail_cache.clear()
-        try:
-            paths = sorted([os.path.join(self.screenshot_dir, f) for f in os.listdir(self.screenshot_dir) if f.lower().endswith(('.png','.jpg','.jpeg','.bmp'))], key=os.path.getmtime, reverse=True)
-            for p in paths:
-                try:
-                    with Image.open(p) as img:
-                        img.thumbnail((40, 40), Image.Resampling.LANCZOS); thumb = ImageTk.PhotoImage(img)
-                        self.thumbnail_cache[p] = thumb; self.tree.insert("", "end", image=thumb, values=(os.path.basename(p),))
-                except Exception: pass
-        except FileNotFoundError: os.makedirs(self.screenshot_dir, exist_ok=True)
+    def load_screenshots(self, rescan=True):
+        """Полная перестройка списка (первый запуск, кнопка "Обновить", пересоздание UI)."""
+        self.thumbnail_loader.cancel()
+        self.tree.delete(*self.tree.get_children()); self._tree_keys = []; self._rows = {}; self._row_info = {}
+        if self.library.directory != self.screenshot_dir:  # папку сменили в настройках
+            self.library.stop(); self.library = self._create_library(); self.library.start()
+            self.thumbnail_store = self.thumbnail_loader.store = ThumbnailStore(self.screenshot_dir); self.thumbnail_cache.clear()
+            rescan = True  # индекс новой папки мог устареть, пока она была не нашей
+        if rescan: self.library.rescan()
+        # Превью декодируются в фоне и только для строк рядом с областью видимости (см. _on_tree_viewport)
+        for entry in self.library.entries(): self._insert_row(entry)
+        if rescan: self._prune_thumbnails()
         self._clear_preview(); self.on_screenshot_select(None)
+
+    def _prune_thumbnails(self):
+        """Удаляет превью удалённых и изменённых файлов. Вызывать только после успешного rescan():
+        снимок из индекса может быть пустым (индекс недоступен), и по нему стёрлись бы все превью.
+        Если сканирование упало, rescan() бросает исключение и до очистки дело не доходит;
+        пустой результат успешного сканирования — это действительно пустая папка."""
+        entries = self.library.entries()
+        store = self.thumbnail_store
+        threading.Thread(target=lambda: store.prune([store.key_for(e.path, e.mtime_ns, e.size) for e in entries]), daemon=True).start()
+
+    def _create_library(self):
+        os.makedirs(self.screenshot_dir, exist_ok=True)
+        try: index = LibraryIndex(self.screenshot_dir)
+        except sqlite3.Error as e: print(f"Library index unavailable: {e}"); index = None
+        return LibrarySync(self.master, self.screenshot_dir, self._apply_library_diff, index=index)
+
+    def sync_library(self):
+        """Применяет только изменения в папке с момента последнего сканирования."""
+        self._apply_library_diff(self.library.rescan()); self._prune_thumbnails()
+
+    def _apply_library_diff(self, diff):
+        if not diff: return
+        self._remove_rows([entry.name for entry in diff.removed + diff.changed])
+        for entry in diff.added + diff.changed: self._insert_row(entry)
+        if self.current_image_path and os.path.basename(self.current_image_path) not in self._rows: self._clear_preview()
+        if diff.removed or diff.changed: self.on_screenshot_select(None)
+
+    def _insert_row(self, entry):
+        sort_key = entry.sort_key; index = bisect.bisect(self._tree_keys, sort_key)
+        item = self.tree.insert("", index if index < len(self._tree_keys) else "end", values=(entry.name,))
+        self._tree_keys.insert(index, sort_key); self._rows[entry.name] = item; self._row_info[item] = entry
+
+    def _remove_rows(self, names):
+        items = []
+        for name in names:
+            item = self._rows.pop(name, None)
+            if item is None: continue
+            entry = self._row_info.pop(item); items.append(item)
+            del self._tree_keys[bisect.bisect_left(self._tree_keys, entry.sort_key)]
+            key = self.thumbnail_store.key_for(entry.path, entry.mtime_ns, entry.size)
+            self.thumbnail_cache.pop(key, None); self.thumbnail_store.discard(key)
+        self.thumbnail_loader.discard(items); self.tree.delete(*items)
+
+    def _prefetch_budget(self):
+        return max(0, int(self.settings_manager.settings["prefetch_memory_mb"])) * 1024 * 1024
+
+    def apply_runtime_settings(self):
+        """Настройки, которые применяются без пересоздания интерфейса."""
+        self.preview_prefetcher.cache.resize(self._prefetch_budget())
+        self.capture_writer.encoder = encoder_from_settings(self.settings_manager.settings)
+
+    def _prefetch_neighbours(self, item):
+        # Соседние превью декодируются заранее: ближайшие первыми, попеременно вниз и вверх по списку
+        depth = max(0, int(self.settings_manager.settings["prefetch_depth"]))
+        if not depth: return
+        index = self.tree.index(item); start = max(0, index - depth); jobs = []
+        nearby = self.tree.children_slice(start, index + depth + 1)  # только соседи, а не вся папка
+        for step in range(1, depth + 1):
+            for i in (index + step - start, index - step - start):
+                entry = self._row_info.get(nearby[i]) if 0 <= i < len(nearby) else None
+                if entry: jobs.append(((entry.path, entry.mtime_ns, entry.size), entry.path))
+        self.preview_prefetcher.prefetch(jobs)
+
+    def _on_tree_viewport(self, visible, window):
+        # Кэш миниатюр ограничен по байтам, так что память не растёт с размером папки
+        jobs, visible_set = [], set(visible)
+        for item in list(visible) + [i for i in window if i not in visible_set]:
+            entry = self._row_info.get(item)
+            if entry is None: continue
+            key = self.thumbnail_store.key_for(entry.path, entry.mtime_ns, entry.size); thumb = self.thumbnail_cache.get(key)
+            if thumb is None: jobs.append((item, entry.path, entry.mtime_ns, entry.size))
+            else: self.tree.item(item, image=thumb)
+        self.thumbnail_loader.request(jobs)
+
+    def _on_thumbnail_ready(self, item_id, key, pil_thumb):
+        # В кэш кладётся и превью строки, уже ушедшей из окна: при обратной прокрутке его не придётся декодировать снова
+        thumb = ImageTk.PhotoImage(pil_thumb); self.thumbnail_cache.put(key, thumb)
+        if self.tree.in_window(item_id): self.tree.item(item_id, image=thumb)
     
     def _upload_current_image(self):
-        if self.current_image: self._start_upload_thread(self.current_image)
+        # Файл из библиотеки уходит как есть, без декодирования и перекодирования в PNG
+        if self.current_image_path and os.path.isfile(self.current_image_path):
+            self.uploads.upload_file(self.current_image_path); self.show_toast("Загрузка...")
+        elif self.current_image: self._queue_upload(self.current_image)
         else: messagebox.showwarning("Нет выбора", "Сначала выберите скриншот из списка.", parent=self.master)
         
     def _copy_current_image(self):
@@ -318,7 +529,8 @@ class ScreenshotApp:
     def _delete_current_image(self):
         if not self.current_image_path: messagebox.showwarning("Нет выбора", "Сначала выберите файл.", parent=self.master); return
         if messagebox.askyesno("Удаление", f"Удалить {os.path.basename(self.current_image_path)}?"):
-            try: os.remove(self.current_image_path); self.load_screenshots()
+            path = self.current_image_path
+            try: os.remove(path); self._apply_library_diff(self.library.refresh([os.path.basename(path)]))
             except Exception as e: messagebox.showerror("Ошибка", f"Не удалось удалить: {e}", parent=self.master)
             
     def _open_current_folder(self):
@@ -328,34 +540,65 @@ class ScreenshotApp:
             else: os.system(f'open "{d}"' if sys.platform=="darwin" else f'xdg-open "{d}"')
             
     def save_screenshot(self, image):
-        f = os.path.join(self.screenshot_dir, f"screenshot_{datetime.datetime.now():%Y-%m-%d_%H-%M-%S}.png")
-        image.convert("RGB").save(f); self.load_screenshots(); self.show_toast("Скриншот сохранен")
+        # Кодирование и запись идут в фоне, горячая клавиша сразу готова к следующему снимку
+        self.capture_writer.submit(image, self.screenshot_dir)
+
+    def _on_capture_saved(self, path):
+        if os.path.dirname(path) == self.screenshot_dir: self._apply_library_diff(self.library.refresh([os.path.basename(path)]))
+        if not self.burst.claims(path): self.show_toast("Скриншот сохранен")
+
+    def _on_capture_failed(self, path, error):
+        print(f"Failed to save {path}: {error}"); self.show_toast(f"Не удалось сохранить скриншот: {error}")
         
-    def process_selected_area(self, image, action):
+    def process_selected_area(self, image, action, region=None):
         if not image or action == "cancel":
             if self.settings_manager.settings.get("hide_on_screenshot", True): self.show_window()
             return
-        h = {"save": self.save_screenshot, "copy": self.copy_image_to_clipboard, "scan_qr": self.scan_qr_code, "upload": self._start_upload_thread}
+        # Для записи выделение вызывает нас уже после <Unmap> оверлея, так что первые кадры его не захватят;
+        # окно покажется после остановки записи
+        if action == "record": return self._start_recording(region)
+        h = {"save": self.save_screenshot, "copy": self.copy_image_to_clipboard, "scan_qr": self.scan_qr_code, "upload": self._queue_upload}
         if action in h: h[action](image)
         if self.settings_manager.settings.get("open_window_after_shot", True): self.show_window()
+
+    def _start_recording(self, region):
+        s = self.settings_manager.settings; fmt = s["record_format"] if s["record_format"] in RECORD_FORMATS else "apng"
+        path = capture_path(self.screenshot_dir, "recording", RECORD_FORMATS[fmt])
+        recorder = RegionRecorder(self.master, self.capture_backend, region, path, fmt, float(s["record_fps"]), float(s["record_max_s"]),
+                                  on_finish=lambda stats, error: self._on_recording_finished(panel, stats, error))
+        # Панель управления ставится над областью (или под ней), чтобы не попасть в запись
+        panel = tk.Toplevel(self.master); panel.overrideredirect(True); panel.attributes("-topmost", True)
+        label = tk.Label(panel, text="⏺ 0:00", bg="#111", fg="#FF5555", padx=10, pady=6, font=("Arial", 10)); label.pack(side="left")
+        tk.Button(panel, text="■ Стоп", command=recorder.stop, bg="#3C3C3C", fg="white", activebackground="#007ACC",
+                  activeforeground="white", relief="flat", font=("Arial", 10), padx=10).pack(side="left")
+        panel.update_idletasks()
+        y = region[1] - panel.winfo_reqheight() - 6
+        panel.geometry(f"+{region[0]}+{y if y >= 0 else region[3] + 6}")
+        def tick():
+            if not panel.winfo_exists(): return
+            seconds = int(recorder.elapsed); label.config(text=f"⏺ {seconds // 60}:{seconds % 60:02d}"); panel.after(500, tick)
+        recorder.start(); tick()
+
+    def _on_recording_finished(self, panel, stats, error):
+        try: panel.destroy()
+        except tk.TclError: pass
+        if error: self.show_toast(f"Не удалось записать: {error}")
+        else:
+            self._apply_library_diff(self.library.refresh([os.path.basename(stats.path)]))
+            self.show_toast(f"Запись сохранена: {stats.written} кадров, {stats.fps:.0f} к/с" + (f", пропущено {stats.dropped}" if stats.dropped else ""))
+        if self.settings_manager.settings.get("open_window_after_shot", True): self.show_window()
         
-    def _start_upload_thread(self, image):
-        if image: threading.Thread(target=self._upload_to_catbox, args=(image,), daemon=True).start()
-        
-    def _upload_to_catbox(self, image):
-        self.master.after(0, lambda: self.show_toast("Загрузка..."))
-        try:
-            with io.BytesIO() as b:
-                image.save(b, "PNG"); b.seek(0)
-                r=requests.post("https://catbox.moe/user/api.php", data={'reqtype': 'fileupload'}, files={'fileToUpload': ('ss.png', b)}, timeout=20); r.raise_for_status()
-                image_url = r.text
-                if image_url.startswith("http"):
-                    self._copy_text_to_clipboard(image_url)
-                    self.master.after(0, lambda: self._add_to_history(image_url))
-                    self.master.after(0, lambda: self.show_toast("Ссылка скопирована!"))
-                else: raise Exception(f"API Error: {image_url}")
-        except Exception as e:
-            self.master.after(0, lambda: self.show_toast(f"Ошибка: {e}"))
+    def _queue_upload(self, image):
+        if image: self.uploads.upload_image(image); self.show_toast("Загрузка...")
+
+    def _on_upload_done(self, job, url):
+        self._copy_text_to_clipboard(url); self._add_to_history(url)
+        self.show_toast("Ссылка скопирована!")
+
+    def _on_upload_failed(self, job, error):
+        print(f"Upload of {job.filename} failed: {error}")
+        retry = " (повтор при следующем запуске)" if getattr(error, "transient", False) else ""
+        self.show_toast(f"Ошибка загрузки: {error}{retry}")
             
     def _copy_text_to_clipboard(self, text):
         self.master.clipboard_clear(); self.master.clipboard_append(text)
@@ -377,15 +620,31 @@ class ScreenshotApp:
     
     def show_window(self): self.master.deiconify(); self.master.lift(); self.master.focus_force()
     
-    def on_quit(self, i, item): self.rehook_hotkeys(True); self.tray_icon.stop(); self.master.quit()
+    def on_quit(self, i, item): self.rehook_hotkeys(True); self.capture_writer.flush(timeout=10); self.uploads.close(); self.capture_backend.release_thread(); self.tray_icon.stop(); self.master.quit()
         
+    def toggle_burst(self):
+        # Вызывается из потоков трея и горячих клавиш
+        self.master.after(0, self._toggle_burst)
+
+    def _toggle_burst(self):
+        if self.burst.active: self.burst.stop(); return
+        s = self.settings_manager.settings
+        bbox = self.capture_backend.monitor_under_cursor().bbox if s["capture_scope"] == "cursor" else None
+        self.burst.start(self.screenshot_dir, int(s["burst_interval_ms"]), float(s["burst_duration_s"]), int(s["burst_buffer_frames"]), bbox,
+                         buffer_bytes=max(1, int(s["burst_buffer_mb"])) * 1024 * 1024)
+        self.show_toast(f"Серия: кадр каждые {int(s['burst_interval_ms'])} мс")
+
+    def _on_burst_finished(self, stats):
+        self.show_toast(f"Серия завершена: сохранено {stats.saved}, повторов пропущено {stats.duplicates}" + (f", потеряно {stats.dropped}" if stats.dropped else ""))
+
     def take_full_screenshot(self):
-        delay = 150 if self.settings_manager.settings["hide_on_screenshot"] else 1
-        if delay > 1: self.master.withdraw()
-        self.master.after(delay, self._capture_full)
+        if self.settings_manager.settings["hide_on_screenshot"]: withdraw_then(self.master, self._capture_full)
+        else: self.master.after(1, self._capture_full)
         
     def _capture_full(self):
-        s = ImageGrab.grab(all_screens=True); self.save_screenshot(s)
+        backend = self.capture_backend
+        s = backend.grab_under_cursor()[1] if self.settings_manager.settings["capture_scope"] == "cursor" else backend.grab()
+        self.save_screenshot(s)
         if self.settings_manager.settings.get("open_window_after_shot", True): self.show_window()
         
     def rehook_hotkeys(self, unhook_only=False):
@@ -395,6 +654,9 @@ class ScreenshotApp:
         if hasattr(self, 'area_hotkey') and self.area_hotkey:
             try: keyboard.remove_hotkey(self.area_hotkey)
             except Exception: pass
+        if self.burst_hotkey:
+            try: keyboard.remove_hotkey(self.burst_hotkey)
+            except Exception: pass
         if unhook_only: return
         s = self.settings_manager.settings
         try:
@@ -403,9 +665,12 @@ class ScreenshotApp:
         try:
             self.area_hotkey = keyboard.add_hotkey(s["hotkey_select_area"], self.selection_tool.start_selection)
         except Exception as e: print(f"Не удалось назначить горячую клавишу '{s['hotkey_select_area']}': {e}")
+        try:
+            self.burst_hotkey = keyboard.add_hotkey(s["hotkey_burst"], self.toggle_burst)
+        except Exception as e: print(f"Не удалось назначить горячую клавишу '{s['hotkey_burst']}': {e}")
             
     def resize_image_event(self, e):
-        if self.current_image: self.display_image()
+        if self.current_image: self.preview.resize()
         
     def copy_image_to_clipboard(self, image):
         if not IS_WINDOWS: return self.show_toast("Копирование только для Windows")
@@ -416,10 +681,15 @@ class ScreenshotApp:
         except Exception as e: self.show_toast(f"Ошибка буфера обмена: {e}")
         
     def scan_qr_code(self, image):
-        decoded = qr_decode(image)
-        if not decoded:
+        # Распознавание идёт в фоне: большие области не подвешивают интерфейс
+        self.qr_scanner.scan_async(image, self._on_qr_scanned)
+
+    def _on_qr_scanned(self, scan, error):
+        if error:
+            messagebox.showerror("QR Сканнер", str(error), parent=self.master); return
+        if not scan.texts:
             messagebox.showinfo("QR Сканнер", "QR-код не найден", parent=self.master); return
-        result = "\n".join([o.data.decode("utf-8", 'ignore') for o in decoded])
+        result = "\n".join(scan.texts)
         win = tk.Toplevel(self.master); win.title("Результат сканирования"); win.transient(self.master); win.grab_set()
         tk.Label(win, text="Найденные данные:").pack(padx=10, pady=(10,5))
         text_widget = tk.Text(win, height=5, width=60); text_widget.pack(padx=10); text_widget.insert(tk.END, result)
@@ -429,10 +699,11 @@ class ScreenshotApp:
         
     def _setup_tray_icon(self):
         image = self.icons.get("app_icon_pil")
-        menu = (PyTrayMenuItem('Показать', self.show_window, default=True), PyTrayMenuItem('Скриншот экрана', self.take_full_screenshot), PyTrayMenuItem('Скриншот области', self.selection_tool.start_selection), PyTrayMenuItem('Выход', self.on_quit))
+        menu = (PyTrayMenuItem('Показать', self.show_window, default=True), PyTrayMenuItem('Скриншот экрана', self.take_full_screenshot), PyTrayMenuItem('Скриншот области', self.selection_tool.start_selection), PyTrayMenuItem('Серия скриншотов', self.toggle_burst, checked=lambda item: self.burst.active), PyTrayMenuItem('Выход', self.on_quit))
         self.tray_icon = PyTrayIcon(APP_NAME, image, APP_NAME, menu=menu); threading.Thread(target=self.tray_icon.run, daemon=True).start()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # пул процессов сканирования кодов в собранном exe
     if IS_WINDOWS:
         try:
             from ctypes import windll
@@ -0,0 +1,158 @@
+# preview.py
+import threading
+import tkinter as tk
+from collections import deque
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageTk
+
+from cache import LRUCache
+
+
+class PreviewPyramid:
+    """Halving image pyramid built once per selected image.
+
+    Level 0 is the full image, each next level is half the size (box filter
+    via Image.reduce) until the longer side drops below min_side.
+    """
+    def __init__(self, image: Image.Image, min_side: int = 256):
+        base = image if image.mode in ("RGB", "RGBA") else image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+        self.levels: List[Image.Image] = [base]
+        while max(self.levels[-1].size) // 2 >= min_side:
+            self.levels.append(self.levels[-1].reduce(2))
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.levels[0].size
+
+    def fitted_size(self, box: Tuple[int, int]) -> Tuple[int, int]:
+        """Size of the image fitted into box without upscaling"""
+        w, h = self.size
+        ratio = min(box[0] / w, box[1] / h, 1.0)
+        return max(1, round(w * ratio)), max(1, round(h * ratio))
+
+    def level_for(self, size: Tuple[int, int]) -> Image.Image:
+        """Smallest level that is still at least size"""
+        for level in reversed(self.levels):
+            if level.width >= size[0] and level.height >= size[1]: return level
+        return self.levels[0]
+
+    def render(self, box: Tuple[int, int], resample) -> Image.Image:
+        size = self.fitted_size(box)
+        level = self.level_for(size)
+        return level if level.size == size else level.resize(size, resample)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated pixel-buffer size of all levels"""
+        return sum(level.width * level.height * len(level.getbands()) for level in self.levels)
+
+
+def load_pyramid(path: str) -> PreviewPyramid:
+    with Image.open(path) as img:
+        img.load()
+        return PreviewPyramid(img)
+
+
+class PreviewPrefetcher:
+    """Decodes previews of the neighbours of the current selection in the background.
+
+    prefetch() replaces whatever is still queued, so holding an arrow key only
+    ever works on the rows around the latest selection.
+    """
+    def __init__(self, cache: LRUCache, workers: int = 2):
+        self.cache = cache
+        self._cond = threading.Condition()
+        self._queue: deque = deque()
+        self._in_flight = set()
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def load(self, key, path: str) -> PreviewPyramid:
+        """Cached pyramid for key, decoding path synchronously on a miss"""
+        pyramid = self.cache.get(key)
+        if pyramid is None:
+            pyramid = load_pyramid(path); self.cache.put(key, pyramid)
+        return pyramid
+
+    def prefetch(self, jobs: Iterable[Tuple[Hashable, str]]):
+        """jobs: (key, path) pairs in priority order"""
+        with self._cond:
+            self._queue = deque((key, path) for key, path in jobs if key not in self.cache and key not in self._in_flight)
+            if self._queue: self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue: self._cond.wait()
+                key, path = self._queue.popleft()
+                if key in self.cache or key in self._in_flight: continue
+                self._in_flight.add(key)
+            try: self.cache.put(key, load_pyramid(path))
+            except Exception as e: print(f"Prefetch failed for {path}: {e}")
+            finally:
+                with self._cond: self._in_flight.discard(key)
+
+
+class PreviewRenderer:
+    """Draws the selected image centred on a canvas.
+
+    <Configure> storms are coalesced into one fast BILINEAR frame per idle
+    cycle, served from the nearest pyramid level; once no resize has arrived
+    for settle_ms the frame is redrawn with LANCZOS.
+    """
+    def __init__(self, canvas: tk.Canvas, settle_ms: int = 150):
+        self.canvas = canvas
+        self.settle_ms = settle_ms
+        self.pyramid: Optional[PreviewPyramid] = None
+        self._photo: Optional[ImageTk.PhotoImage] = None
+        self._item = None
+        self._drawn = None  # (canvas size, high quality) of the current frame
+        self._fast_id = None
+        self._refine_id = None
+
+    def show(self, image):
+        """image: a PIL image or an already built PreviewPyramid"""
+        self.pyramid = image if isinstance(image, PreviewPyramid) else PreviewPyramid(image); self._drawn = None
+        self._cancel()
+        self._draw(high_quality=True)
+
+    def clear(self):
+        self._cancel()
+        self.pyramid = None; self._photo = None; self._item = None; self._drawn = None
+        self.canvas.delete("all")
+
+    def resize(self):
+        """Call from <Configure>: draws a fast frame now and a refined one when resizing stops"""
+        if self.pyramid is None: return
+        if self._fast_id is None: self._fast_id = self.canvas.after_idle(self._draw_fast)
+        if self._refine_id is not None: self.canvas.after_cancel(self._refine_id)
+        self._refine_id = self.canvas.after(self.settle_ms, self._draw_refined)
+
+    def _cancel(self):
+        for timer in (self._fast_id, self._refine_id):
+            if timer is not None:
+                try: self.canvas.after_cancel(timer)
+                except tk.TclError: pass
+        self._fast_id = self._refine_id = None
+
+    def _draw_fast(self):
+        self._fast_id = None; self._draw(high_quality=False)
+
+    def _draw_refined(self):
+        self._refine_id = None; self._draw(high_quality=True)
+
+    def _draw(self, high_quality: bool):
+        if self.pyramid is None: return
+        box = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        if box[0] < 10 or box[1] < 10:
+            self._refine_id = self.canvas.after(50, self._draw_refined); return
+        if self._drawn == (box, True) or self._drawn == (box, high_quality): return
+        frame = self.pyramid.render(box, Image.Resampling.LANCZOS if high_quality else Image.Resampling.BILINEAR)
+        self._photo = ImageTk.PhotoImage(frame)
+        if self._item is None or not self.canvas.find_withtag(self._item):
+            self.canvas.delete("all")
+            self._item = self.canvas.create_image(box[0] / 2, box[1] / 2, anchor="center", image=self._photo)
+        else:
+            self.canvas.coords(self._item, box[0] / 2, box[1] / 2); self.canvas.itemconfigure(self._item, image=self._photo)
+        self._drawn = (box, high_quality)
@@ -0,0 +1,121 @@
+# qr_scan.py
+import time
+import hashlib
+import threading
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+from cache import LRUCache
+
+try:
+    from pyzbar.pyzbar import decode as zbar_decode
+except ImportError:  # pyzbar is installed but the zbar shared library is missing
+    zbar_decode = None
+
+Decoder = Callable[[Image.Image], list]  # pyzbar-style: objects with .data (bytes) and .type
+
+
+class ScanResult(NamedTuple):
+    texts: Tuple[str, ...]  # empty when nothing was found
+    attempt: str            # preprocessing step that found the code
+    attempts: int           # decoder calls made
+    seconds: float
+    cached: bool = False
+
+
+def adaptive_threshold(gray: Image.Image, radius: int = 15, offset: int = 10) -> Image.Image:
+    """Black where a pixel is darker than its neighbourhood mean minus offset.
+
+    Handles gradients and uneven lighting that a global threshold gets wrong;
+    the local mean is a box blur, the comparison one subtract and one LUT.
+    """
+    mean = gray.filter(ImageFilter.BoxBlur(radius))
+    level = 128 - offset
+    return ImageChops.subtract(gray, mean, offset=128).point([0] * level + [255] * (256 - level))
+
+
+def preprocessed(image: Image.Image, quick: bool = False) -> Iterator[Tuple[str, Image.Image]]:
+    """Variants to try, cheapest and most likely first.
+
+    Small crops are upscaled (zbar needs about 2-3 px per module), big ones
+    also tried downscaled; rotations are for linear barcodes, which zbar
+    only reads roughly horizontally. quick stops after the first four, for
+    library-wide scans where most images hold no code at all.
+    """
+    gray = image.convert("L")
+    yield "gray", gray
+    contrast = ImageOps.autocontrast(gray, cutoff=1)
+    yield "autocontrast", contrast
+    yield "adaptive", adaptive_threshold(contrast)
+    yield "inverted", ImageOps.invert(contrast)  # light-on-dark codes in dark themes are common
+    if quick: return
+    side = min(gray.size)
+    scales = [s for s in (2, 3) if side * s <= 1600] if side < 400 else [0.5] if max(gray.size) > 1600 else []
+    for scale in scales:
+        scaled = contrast.resize((round(gray.width * scale), round(gray.height * scale)), Image.Resampling.LANCZOS)
+        yield f"x{scale:g}", scaled
+        yield f"x{scale:g} adaptive", adaptive_threshold(scaled, radius=max(3, round(15 * scale)))
+    for angle in (90, 45, -45):
+        yield f"rotated {angle}", contrast.rotate(angle, Image.Resampling.BICUBIC, expand=True, fillcolor=255)
+
+
+def scan_file(path: str) -> List[Tuple[str, str]]:
+    """[(symbol type, text), ...] of the codes in an image file, quick variants only.
+    Top-level so it can run in a process pool."""
+    if zbar_decode is None: raise RuntimeError("zbar library not found, QR scanning is unavailable")
+    with Image.open(path) as img:
+        img.draft("RGB", img.size)
+        image = img.convert("L")
+    for _, variant in preprocessed(image, quick=True):
+        found = zbar_decode(variant)
+        if found: return list(dict.fromkeys((o.type, o.data.decode("utf-8", "ignore")) for o in found))
+    return []
+
+
+def content_key(image: Image.Image) -> str:
+    return f"{image.mode}:{image.size}:" + hashlib.blake2b(image.tobytes(), digest_size=16).hexdigest()
+
+
+class QrScanner:
+    """QR/barcode scanning through a preprocessing pipeline, off the Tk thread.
+
+    scan() tries the variants from preprocessed() until the decoder finds
+    something and caches the outcome (misses included) by content hash, so
+    scanning the same crop again is free. scan_async() runs scan() on a
+    worker thread and calls on_done(ScanResult or None, error) on the Tk
+    thread.
+    """
+    POLL_INTERVAL_MS = 50
+    CACHE_BUDGET = 256 * 1024
+
+    def __init__(self, master=None, decode: Optional[Decoder] = None):
+        self.master = master
+        self.decode = decode or zbar_decode
+        self._cache = LRUCache(self.CACHE_BUDGET, sizeof=lambda r: 128 + sum(len(t) for t in r.texts), name="qr")
+
+    def scan(self, image: Image.Image) -> ScanResult:
+        if self.decode is None: raise RuntimeError("zbar library not found, QR scanning is unavailable")
+        key = content_key(image)
+        hit = self._cache.get(key)
+        if hit is not None: return hit._replace(cached=True)
+        t0 = time.perf_counter(); attempts = 0; texts: Tuple[str, ...] = (); label = ""
+        for label, variant in preprocessed(image):
+            attempts += 1
+            found = self.decode(variant)
+            if found:
+                texts = tuple(dict.fromkeys(o.data.decode("utf-8", "ignore") for o in found)); break
+        result = ScanResult(texts, label if texts else "", attempts, time.perf_counter() - t0)
+        self._cache.put(key, result)
+        return result
+
+    def scan_async(self, image: Image.Image, on_done: Callable[[Optional[ScanResult], Optional[Exception]], None]):
+        outcome: List[tuple] = []
+        def work():
+            try: outcome.append((self.scan(image), None))
+            except Exception as e: outcome.append((None, e))
+        def poll():
+            if outcome: on_done(*outcome[0])
+            else: self.master.after(self.POLL_INTERVAL_MS, poll)
+        threading.Thread(target=work, daemon=True).start()
+        self.master.after(self.POLL_INTERVAL_MS, poll)
@@ -0,0 +1,257 @@
+# recording.py
+import io
+import os
+import time
+import zlib
+import queue
+import struct
+import threading
+from typing import BinaryIO, Callable, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from capture import BBox, CaptureBackend
+
+RECORD_FORMATS = {"apng": ".png", "webp": ".webp", "gif": ".gif"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(fp: BinaryIO, ctype: bytes, data: bytes):
+    fp.write(struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data) & 0xFFFFFFFF))
+
+
+def _png_image_data(image: Image.Image, compress_level: int) -> bytes:
+    """Filtered, deflated pixel data of image as Pillow writes it (all IDAT payloads joined)"""
+    buf = io.BytesIO(); image.save(buf, "PNG", compress_level=compress_level)
+    data, pos, parts = buf.getbuffer(), len(PNG_SIGNATURE), []
+    while pos < len(data):
+        length, ctype = struct.unpack_from(">I4s", data, pos)
+        if ctype == b"IDAT": parts.append(bytes(data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return b"".join(parts)
+
+
+class ApngWriter:
+    """Streaming APNG writer: every frame goes straight to the file.
+
+    Frames are sub-rectangles of the canvas (dispose NONE, blend SOURCE), so
+    only the changed region of each frame is encoded. The frame count in acTL
+    is patched in on close(), which needs a seekable file.
+    """
+    def __init__(self, fp: BinaryIO, size: Tuple[int, int], compress_level: int = 1):
+        self.fp = fp
+        self.size = size
+        self.compress_level = compress_level
+        self.frames = 0
+        self._sequence = 0
+        fp.write(PNG_SIGNATURE)
+        _png_chunk(fp, b"IHDR", struct.pack(">IIBBBBB", size[0], size[1], 8, 2, 0, 0, 0))  # 8-bit RGB
+        self._actl_offset = fp.tell()
+        _png_chunk(fp, b"acTL", struct.pack(">II", 0, 0))
+
+    def add(self, region: Image.Image, x: int, y: int, delay_ms: float):
+        """The first frame must cover the whole canvas"""
+        delay = max(1, min(0xFFFF, round(delay_ms / 10)))  # in 1/100 s, so single frames can last ~11 minutes
+        _png_chunk(self.fp, b"fcTL", struct.pack(">IIIIIHHBB", self._sequence, region.width, region.height, x, y, delay, 100, 0, 0))
+        self._sequence += 1
+        data = _png_image_data(region, self.compress_level)
+        if self.frames == 0: _png_chunk(self.fp, b"IDAT", data)
+        else:
+            _png_chunk(self.fp, b"fdAT", struct.pack(">I", self._sequence) + data); self._sequence += 1
+        self.frames += 1
+
+    def close(self):
+        _png_chunk(self.fp, b"IEND", b"")
+        end = self.fp.tell()
+        self.fp.seek(self._actl_offset); _png_chunk(self.fp, b"acTL", struct.pack(">II", self.frames, 0))
+        self.fp.seek(end)
+
+
+class GifWriter:
+    """Streaming GIF writer.
+
+    Each changed region is quantized and LZW-encoded by Pillow as a one-frame
+    GIF, whose global palette is then re-emitted as the local palette of a
+    frame placed at (x, y) in our own file.
+    """
+    def __init__(self, fp: BinaryIO, size: Tuple[int, int]):
+        self.fp = fp
+        self.size = size
+        self.frames = 0
+        fp.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0, 0, 0))
+        fp.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+
+    def add(self, region: Image.Image, x: int, y: int, delay_ms: float):
+        buf = io.BytesIO(); region.convert("P", palette=Image.Palette.ADAPTIVE).save(buf, "GIF", interlace=False)
+        data = buf.getvalue()
+        packed = data[10]; pos = 13
+        gct = data[pos:pos + 3 * (2 << (packed & 7))] if packed & 0x80 else b""
+        pos += len(gct)
+        while data[pos] == 0x21:  # skip Pillow's extensions, ours replace them
+            pos += 2
+            while data[pos]: pos += data[pos] + 1
+            pos += 1
+        left, top, width, height, image_packed = struct.unpack_from("<HHHHB", data, pos + 1)
+        pos += 10
+        if not image_packed & 0x80 and gct: image_packed |= 0x80 | (packed & 7); palette = gct
+        else: palette = b""
+        delay = max(2, min(0xFFFF, round(delay_ms / 10)))  # browsers turn delays under 2/100 s into 10
+        self.fp.write(b"\x21\xF9\x04" + struct.pack("<BHBB", 0x04, delay, 0, 0))  # dispose: leave in place
+        self.fp.write(b"\x2C" + struct.pack("<HHHHB", x + left, y + top, width, height, image_packed) + palette)
+        self.fp.write(data[pos:data.rindex(b"\x3B")])
+        self.frames += 1
+
+    def close(self):
+        self.fp.write(b"\x3B")
+
+
+class WebpWriter:
+    """Animated lossless WebP: frames are streamed into a temporary APNG and
+    transcoded on close(). Pillow reads the APNG back one frame at a time, so
+    memory stays flat during both passes."""
+    def __init__(self, fp: BinaryIO, size: Tuple[int, int], temp_path: str):
+        self.fp = fp
+        self.size = size
+        self.temp_path = temp_path
+        self._temp = open(temp_path, "w+b")
+        self._apng = ApngWriter(self._temp, size, compress_level=0)
+        self._durations: List[int] = []
+
+    @property
+    def frames(self) -> int:
+        return self._apng.frames
+
+    def add(self, region: Image.Image, x: int, y: int, delay_ms: float):
+        self._apng.add(region, x, y, delay_ms); self._durations.append(max(1, round(delay_ms)))
+
+    def close(self):
+        try:
+            self._apng.close(); self._temp.seek(0)
+            with Image.open(self._temp) as anim:
+                anim.save(self.fp, "WEBP", save_all=True, duration=self._durations, lossless=True, method=0, loop=0)
+        finally:
+            self._temp.close()
+            try: os.remove(self.temp_path)
+            except OSError: pass
+
+
+def open_animation_writer(fmt: str, fp: BinaryIO, size: Tuple[int, int], path: str):
+    if fmt == "gif": return GifWriter(fp, size)
+    if fmt == "webp": return WebpWriter(fp, size, path + ".frames")
+    return ApngWriter(fp, size)
+
+
+class RecordingStats(NamedTuple):
+    path: str
+    captured: int    # frames grabbed
+    written: int     # frames encoded (changed regions only)
+    unchanged: int   # identical to the previous frame, folded into its delay
+    dropped: int     # grabbed while the encoder was behind
+    seconds: float
+
+    @property
+    def fps(self) -> float:
+        return (self.written + self.unchanged) / self.seconds if self.seconds else 0.0
+
+
+class RegionRecorder:
+    """Records a screen region at a fixed frame rate into an animated file.
+
+    A capture thread grabs the region every 1/fps and hands frames to an
+    encoder thread through a short queue; when the encoder falls behind new
+    frames are dropped instead of queued, so memory holds at most a few
+    frames however long the recording runs. The encoder diffs each frame
+    against the previous one and writes only the bounding box of the changed
+    pixels; unchanged frames just extend the previous frame's delay. The file
+    is written as path + ".part" and renamed into place when done.
+    on_finish(RecordingStats or None, error) runs on the Tk thread.
+    """
+    QUEUE_FRAMES = 4
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, master, backend: CaptureBackend, bbox: BBox, path: str, fmt: str = "apng", fps: float = 10,
+                 max_seconds: float = 300, on_finish: Optional[Callable[[Optional[RecordingStats], Optional[Exception]], None]] = None):
+        self.master = master
+        self.backend = backend
+        self.bbox = bbox
+        self.path = path
+        self.fmt = fmt if fmt in RECORD_FORMATS else "apng"
+        self.fps = max(1.0, min(60.0, fps))
+        self.max_seconds = max_seconds
+        self.on_finish = on_finish
+        self.started_at = 0.0
+        self._stop = threading.Event()
+        self._frames: "queue.Queue" = queue.Queue(self.QUEUE_FRAMES)
+        self._captured = self._dropped = 0
+        self._result = None
+        self._encoder: Optional[threading.Thread] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at if self.started_at else 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        threading.Thread(target=self._capture_loop, daemon=True).start()
+        self._encoder = threading.Thread(target=self._encode_loop, daemon=True); self._encoder.start()
+        if self.master is not None: self.master.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self):
+        """Block until the file is finished (for scripts and benchmarks); returns (stats, error)"""
+        self._encoder.join(); return self._result
+
+    def _capture_loop(self):
+        interval = 1 / self.fps; start = self.started_at; tick = 0
+        try:
+            while not self._stop.is_set() and time.perf_counter() - start < self.max_seconds:
+                t = time.perf_counter(); frame = self.backend.grab(self.bbox); self._captured += 1
+                try: self._frames.put_nowait((t, frame))
+                except queue.Full: self._dropped += 1
+                tick = max(tick + 1, int((time.perf_counter() - start) / interval))
+                self._stop.wait(max(0.0, start + tick * interval - time.perf_counter()))
+        except Exception as e:
+            print(f"Recording capture failed: {e}")
+        finally:
+            self.backend.release_thread()
+            self._stop.set()
+            # The encoder may already be gone (it failed) and the queue full: never block on the sentinel
+            try: self._frames.put((time.perf_counter(), None), timeout=1)
+            except queue.Full: pass
+
+    def _encode_loop(self):
+        temp = self.path + ".part"; written = unchanged = 0
+        try:
+            with open(temp, "w+b") as fp:
+                writer = None; previous = None; pending = None  # pending: (region, x, y, shown_at)
+                while True:
+                    t, frame = self._frames.get()
+                    if frame is None: end = t; break
+                    if frame.mode != "RGB": frame = frame.convert("RGB")
+                    if writer is None:
+                        writer = open_animation_writer(self.fmt, fp, frame.size, self.path); pending = (frame, 0, 0, t)
+                    else:
+                        box = ImageChops.difference(frame, previous).getbbox() if frame.size == previous.size else None
+                        if box is None: unchanged += 1; continue
+                        region, x, y, shown_at = pending
+                        writer.add(region, x, y, (t - shown_at) * 1000); written += 1
+                        pending = (frame.crop(box), box[0], box[1], t)
+                    previous = frame
+                if writer is None: raise RuntimeError("no frames were captured")
+                region, x, y, shown_at = pending
+                writer.add(region, x, y, max(1 / self.fps, end - shown_at) * 1000); written += 1
+                writer.close()
+            os.replace(temp, self.path)
+            self._result = (RecordingStats(self.path, self._captured, written, unchanged, self._dropped, self.elapsed), None)
+        except Exception as e:
+            self._stop.set()  # nothing will write the frames any more: stop grabbing the screen
+            try: os.remove(temp)
+            except OSError: pass
+            self._result = (None, e)
+
+    def _poll(self):
+        if self._result is None: self.master.after(self.POLL_INTERVAL_MS, self._poll); return
+        if self.on_finish: self.on_finish(*self._result)
@@ -1,14 +1,16 @@
 # selection.py (Версия с "Классическим" поведением и горячими клавишами)
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk, ImageGrab, ImageDraw
+from PIL import Image, ImageTk
 import logging
 import sys
+import time
 from enum import Enum, auto
 from typing import Callable, Optional, Tuple, Dict, Any
 
+from edges import EdgeMapBuilder
 from enums import SelectionAction
-from helpers import Tooltip, Animator 
+from helpers import Tooltip, Animator, FrameCoalescer, withdraw_then
 
 IS_WINDOWS = sys.platform == "win32"
 if IS_WINDOWS:
@@ -25,12 +27,31 @@ else:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DIM_ALPHA = 120  # darkening of the area outside the selection, as the alpha of a black overlay
+_DIM_LUT = [(i * (255 - DIM_ALPHA) + 127) // 255 for i in range(256)] * 3
+
+def dim_image(image: Image.Image) -> Image.Image:
+    """Darkened RGB copy of image: the same result as compositing black at DIM_ALPHA,
+    done as one lookup-table pass instead of RGBA conversion plus alpha_composite"""
+    if image.mode != "RGB": image = image.convert("RGB")
+    return image.point(_DIM_LUT)
+
 class State(Enum):
-    INACTIVE = auto()
-    SELECTING = auto()
+    INACTIVE = auto()   # overlay hidden
+    STARTING = auto()   # waiting for the main window to disappear, then capturing
+    READY = auto()      # overlay shown, waiting for the first click
+    SELECTING = auto()  # dragging out the area
+    CHOOSING = auto()   # action panel shown
 
 class MagnifierLens:
-    def __init__(self, screenshot: Image.Image):
+    """Zoomed view next to the cursor. The window is created once and only
+    withdrawn between selections; set_source() swaps the screenshot.
+
+    Motion events only record the latest cursor position; the lens is
+    re-rendered at most once per display frame (FrameCoalescer), by pasting into one
+    PhotoImage shown by one canvas item. The crosshair is two canvas lines
+    that never change."""
+    def __init__(self, screenshot: Optional[Image.Image] = None):
         self.screenshot = screenshot
         self.is_visible = False
         self._zoom = 4; self._size = 140; self._border_size = 3
@@ -38,6 +59,10 @@ class MagnifierLens:
         self._window: Optional[tk.Toplevel] = None
         self._canvas: Optional[tk.Canvas] = None
         self._photo: Optional[ImageTk.PhotoImage] = None
+        self._mapped = False
+        self._pending: Optional[Tuple[tk.Widget, int, int]] = None  # latest (master, x, y) not yet rendered
+        self._frames: Optional[FrameCoalescer] = None
+        self._geometry = ""
 
     def _create_window(self, master: tk.Widget):
         self._window = tk.Toplevel(master)
@@ -45,45 +70,79 @@ class MagnifierLens:
         self._window.attributes("-topmost", True); self._window.attributes("-alpha", 0.95)
         self._canvas = tk.Canvas(self._window, width=self._size, height=self._size, highlightthickness=0)
         self._canvas.pack()
+        self._photo = ImageTk.PhotoImage("RGB", (self._size, self._size))
+        self._canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        center, arm = self._size // 2, self._crosshair_size
+        self._canvas.create_line(center, center - arm, center, center + arm + 1, fill="red")
+        self._canvas.create_line(center - arm, center, center + arm + 1, center, fill="red")
+        self._frames = FrameCoalescer(self._window, self._flush)
+        self._window.withdraw(); self._mapped = False; self._geometry = ""
 
-    def update(self, master: tk.Widget, x: int, y: int):
-        if not self.is_visible: return
+    def prepare(self, master: tk.Widget):
         if not self._window or not self._window.winfo_exists(): self._create_window(master)
+
+    def set_source(self, screenshot: Image.Image):
+        self.screenshot = screenshot
+
+    def update(self, master: tk.Widget, x: int, y: int):
+        if not self.is_visible or self.screenshot is None: return
+        self.prepare(master); self._pending = (master, x, y); self._frames.request()
+
+    def _flush(self):
+        if not self.is_visible or self._pending is None or self.screenshot is None: return
+        master, x, y = self._pending; self._pending = None
+        # x, y are overlay coordinates; the lens window is placed in screen coordinates
         pos_x, pos_y = x + self._offset_from_cursor, y + self._offset_from_cursor
-        if pos_x + self._size > master.winfo_screenwidth(): pos_x = x - self._size - self._offset_from_cursor
-        if pos_y + self._size > master.winfo_screenheight(): pos_y = y - self._size - self._offset_from_cursor
-        self._window.geometry(f"{self._size}x{self._size}+{pos_x}+{pos_y}")
+        if pos_x + self._size > master.winfo_width(): pos_x = x - self._size - self._offset_from_cursor
+        if pos_y + self._size > master.winfo_height(): pos_y = y - self._size - self._offset_from_cursor
+        geometry = f"{self._size}x{self._size}+{master.winfo_rootx() + pos_x}+{master.winfo_rooty() + pos_y}"
+        if geometry != self._geometry: self._window.geometry(geometry); self._geometry = geometry
+        if not self._mapped: self._window.deiconify(); self._mapped = True
         self._render(x, y)
 
     def _render(self, center_x: int, center_y: int):
         try:
             radius = (self._size // self._zoom) // 2
             box = (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
-            source = self.screenshot.crop(box)
-            magnified = source.resize((self._size, self._size), Image.Resampling.NEAREST)
-            draw = ImageDraw.Draw(magnified)
-            center = self._size // 2
-            draw.line((center, center - self._crosshair_size, center, center + self._crosshair_size), fill="red")
-            draw.line((center - self._crosshair_size, center, center + self._crosshair_size, center), fill="red")
-            self._photo = ImageTk.PhotoImage(magnified)
-            self._canvas.delete("all")
-            self._canvas.create_image(0, 0, image=self._photo, anchor="nw")
+            self._photo.paste(self.screenshot.crop(box).resize((self._size, self._size), Image.Resampling.NEAREST))
         except Exception: pass
 
     def show(self): self.is_visible = True
     def hide(self):
-        if self.is_visible:
-            self.is_visible = False
-            if self._window and self._window.winfo_exists(): self._window.withdraw()
+        self.is_visible = False; self._pending = None
+        if self._frames: self._frames.cancel()
+        if self._mapped and self._window and self._window.winfo_exists(): self._window.withdraw()
+        self._mapped = False
+
+    def release(self):
+        """Hide and drop the screenshot, keeping the window for the next selection"""
+        self.hide(); self.screenshot = None
 
     def cleanup(self):
-        self.is_visible = False
+        self.hide()
         if self._window:
             try: self._window.destroy()
             except tk.TclError: pass
-        self._window = self._canvas = self._photo = None
+        self._window = self._canvas = self._photo = self._frames = None; self._mapped = False
 
 class SimpleSelection:
+    """Area selection over a frozen screenshot of the monitor under the cursor.
+
+    The fullscreen overlay, its canvas and the magnifier are built once
+    (prewarm() or the first selection) and only withdrawn between uses; each
+    selection swaps the background image and deletes its own "transient"
+    canvas items. Event handlers stay bound and check the state instead.
+
+    The live selection (bright cut-out, dashed box, size label) is a fixed set
+    of "live" canvas items moved with coords/itemconfigure, redrawn at most
+    once per frame. The cut-out is copied Tk-side from an undimmed copy of
+    the screenshot, so dragging creates no images or items.
+
+    While the overlay is up an EdgeMap of the screenshot is built in the
+    background; once ready, both corners snap to UI boundaries within
+    SNAP_RADIUS (hold Shift to place them freely).
+    """
+    SNAP_RADIUS = 8
     def __init__(self, app):
         self._app = app
         self._on_complete = self._app.process_selected_area
@@ -91,20 +150,40 @@ class SimpleSelection:
         self._state = State.INACTIVE
         self._root: Optional[tk.Toplevel] = None
         self._canvas: Optional[tk.Canvas] = None
+        self._bg_item: Optional[int] = None
+        self._panel: Optional[tk.Frame] = None
         self._screenshot: Optional[Image.Image] = None
-        self._magnifier: Optional[MagnifierLens] = None
+        self._monitor = None
+        self._magnifier = MagnifierLens()
+        self._bg_photo: Optional[ImageTk.PhotoImage] = None  # kept between selections, refilled with paste()
+        self._bright_photo: Optional[ImageTk.PhotoImage] = None  # undimmed screenshot, source of the cut-out
+        self._bright_ready = False; self._bright_job = None
+        self._cut_photo: Optional[tk.PhotoImage] = None
+        self._drag_frames: Optional[FrameCoalescer] = None
+        self._edges = EdgeMapBuilder()
+        self._requested_at = 0.0
+        self.last_timings: Dict[str, float] = {}  # ms per stage of the last hotkey-to-overlay run
         self._start_pos = (0, 0); self._selection_bbox = [0, 0, 0, 0]
 
+    def prewarm(self):
+        """Build the hidden overlay and magnifier windows ahead of the first hotkey"""
+        self._ensure_window(self._app.master); self._magnifier.prepare(self._app.master)
+
     def start_selection(self):
         if self._state != State.INACTIVE: return
-        delay = 150 if self._settings.get("hide_on_screenshot") else 1
-        self._app.master.withdraw()
-        self._app.master.after(delay, lambda: self._capture_and_show(self._app.master))
+        self._requested_at = time.perf_counter(); self._state = State.STARTING
+        master = self._app.master
+        if self._settings.get("hide_on_screenshot"): withdraw_then(master, lambda: self._capture_and_show(master))
+        else: master.withdraw(); master.after(1, lambda: self._capture_and_show(master))
 
     def _capture_and_show(self, master: tk.Widget):
         try:
-            self._screenshot = ImageGrab.grab(all_screens=True)
-            self._magnifier = MagnifierLens(self._screenshot)
+            t0 = time.perf_counter(); self.last_timings = {"hide": (t0 - self._requested_at) * 1000}
+            # Only the monitor under the cursor is grabbed; the overlay covers exactly that monitor
+            self._monitor, self._screenshot = self._app.capture_backend.grab_under_cursor()
+            self.last_timings["capture"] = (time.perf_counter() - t0) * 1000
+            if self._settings.get("snap_selection", True): self._edges.start(self._screenshot)
+            self._magnifier.set_source(self._screenshot)
             self._setup_ui(master)
             self._magnifier.show()
         except Exception as e:
@@ -112,17 +191,52 @@ class SimpleSelection:
             messagebox.showerror("Capture Error", f"Could not capture screen: {e}")
             self._cleanup(); master.deiconify()
 
-    def _setup_ui(self, master: tk.Widget):
-        self._root = tk.Toplevel(master)
-        self._root.attributes("-fullscreen", True); self._root.attributes("-topmost", True)
-        self._root.wait_visibility()
+    def _ensure_window(self, master: tk.Widget):
+        if self._root is not None and self._root.winfo_exists(): return
+        self._root = tk.Toplevel(master); self._root.withdraw()
         self._canvas = tk.Canvas(self._root, cursor="cross", highlightthickness=0)
         self._canvas.pack(fill="both", expand=True)
-        overlay = Image.new('RGBA', self._screenshot.size, (0, 0, 0, 120))
-        bg_image = Image.alpha_composite(self._screenshot.convert('RGBA'), overlay)
-        self._bg_photo = ImageTk.PhotoImage(bg_image)
-        self._canvas.create_image(0, 0, image=self._bg_photo, anchor="nw")
-        self._bind_events(); self._root.focus_force()
+        self._bg_item = self._canvas.create_image(0, 0, anchor="nw")
+        self._cut_photo = tk.PhotoImage(master=self._root)
+        self._cut_item = self._canvas.create_image(0, 0, image=self._cut_photo, anchor="nw", state="hidden", tags="live")
+        self._box_item = self._canvas.create_rectangle(0, 0, 0, 0, outline="#00AAFF", width=1, dash=(4,2), state="hidden", tags="live")
+        self._label_bg = self._canvas.create_rectangle(0, 0, 0, 0, fill="black", outline="", state="hidden", tags="live")
+        self._label_item = self._canvas.create_text(0, 0, fill="white", anchor="w", font=("Segoe UI", 9), state="hidden", tags="live")
+        self._drag_frames = FrameCoalescer(self._root, self._draw_selection_box)
+        self._bind_events()
+
+    def _setup_ui(self, master: tk.Widget):
+        # The dimmed background is ready before the window is shown, so it never flashes empty
+        t0 = time.perf_counter(); dimmed = dim_image(self._screenshot)
+        t1 = time.perf_counter()
+        photo = self._bg_photo
+        if photo is None or (photo.width(), photo.height()) != dimmed.size: self._bg_photo = ImageTk.PhotoImage(dimmed)
+        else: photo.paste(dimmed)  # reuses the Tk image buffer of the previous selection
+        t2 = time.perf_counter()
+        self._ensure_window(master)
+        self._canvas.itemconfigure(self._bg_item, image=self._bg_photo)
+        self._canvas.config(cursor="cross")
+        m = self._monitor
+        self._root.geometry(f"{m.width}x{m.height}+{m.x}+{m.y}")  # -fullscreen fills the monitor the window is on
+        self._root.deiconify()
+        self._root.attributes("-fullscreen", True); self._root.attributes("-topmost", True)
+        self._state = State.READY
+        self._root.wait_visibility(); self._root.focus_force()
+        t3 = time.perf_counter()
+        self.last_timings.update(dim=(t1 - t0) * 1000, photo=(t2 - t1) * 1000, window=(t3 - t2) * 1000,
+                                 total=(t3 - self._requested_at) * 1000)
+        logger.info("Overlay shown %.0f ms after the hotkey (%s)", self.last_timings["total"],
+                    ", ".join(f"{k} {v:.0f}" for k, v in self.last_timings.items() if k != "total"))
+        # The undimmed copy is only needed once dragging starts, so it stays off the hotkey-to-overlay path
+        self._bright_job = self._root.after_idle(self._fill_bright)
+
+    def _fill_bright(self):
+        self._bright_job = None
+        if self._bright_ready or self._screenshot is None: return
+        photo = self._bright_photo
+        if photo is None or (photo.width(), photo.height()) != self._screenshot.size: self._bright_photo = ImageTk.PhotoImage(self._screenshot)
+        else: photo.paste(self._screenshot)
+        self._bright_ready = True
 
     def _bind_events(self):
         self._canvas.bind("<ButtonPress-1>", self._on_press)
@@ -130,22 +244,40 @@ class SimpleSelection:
         self._canvas.bind("<ButtonRelease-1>", self._on_release)
         self._canvas.bind("<Motion>", self._on_mouse_move)
         self._root.bind("<Escape>", lambda e: self._finalize(None, SelectionAction.CANCEL))
+        # Горячие клавиши панели действий: привязаны всегда, работают только когда панель открыта
+        self._root.bind("<Control-s>", lambda e: self._choose(SelectionAction.SAVE))
+        self._root.bind("<Control-c>", lambda e: self._choose(SelectionAction.COPY))
+        self._root.bind("<Control-q>", lambda e: self._choose(SelectionAction.SCAN_QR))
+        self._root.bind("<Control-r>", lambda e: self._choose(SelectionAction.RECORD))
+        self._root.bind("<Control-z>", lambda e: self._choose(SelectionAction.CANCEL))
+
+    def _choose(self, action: SelectionAction):
+        if self._state != State.CHOOSING: return
+        self._finalize(None if action == SelectionAction.CANCEL else self._selection_bbox, action)
+
+    def _snapped(self, event) -> Tuple[int, int]:
+        edges = self._edges.result
+        if edges is None or event.state & 0x0001: return event.x, event.y  # Shift: без прилипания
+        return edges.snap(event.x, event.y, self.SNAP_RADIUS)
 
     def _on_mouse_move(self, event):
-        if self._state == State.INACTIVE:
+        if self._state == State.READY:
             self._magnifier.update(self._root, event.x, event.y)
 
     def _on_press(self, event):
+        if self._state != State.READY: return
         self._state = State.SELECTING
-        self._start_pos = (event.x, event.y)
-        self._selection_bbox = [event.x, event.y, event.x, event.y]
+        if self._edges.result is None: logger.info("Edge map not ready at the first click; snapping starts when it is")
+        self._start_pos = self._snapped(event)
+        self._selection_bbox = [*self._start_pos, *self._start_pos]
         self._magnifier.hide()
+        self._fill_bright()  # normally done already, on idle after the overlay appeared
 
     def _on_drag(self, event):
         if self._state != State.SELECTING: return
-        self._selection_bbox = [self._start_pos[0], self._start_pos[1], event.x, event.y]
-        self._draw_selection_box()
-    
+        self._selection_bbox = [*self._start_pos, *self._snapped(event)]
+        self._drag_frames.request()
+
     def _on_release(self, event):
         if self._state != State.SELECTING: return
         x1, y1, x2, y2 = self._selection_bbox
@@ -157,41 +289,44 @@ class SimpleSelection:
         self._show_action_panel()
 
     def _draw_selection_box(self):
-        self._canvas.delete("selection_elements")
+        c = self._canvas
         x1, y1, x2, y2 = map(int, self._selection_bbox)
         norm_x1, norm_y1, norm_x2, norm_y2 = min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
-        self._canvas.create_rectangle(norm_x1, norm_y1, norm_x2, norm_y2, 
-                                     outline="#00AAFF", width=1, dash=(4,2), tags="selection_elements")
+        # Cut-out: the selected part of the undimmed screenshot, copied inside Tk
+        w, h = self._screenshot.size
+        cx1, cy1, cx2, cy2 = max(0, norm_x1), max(0, norm_y1), min(w, norm_x2), min(h, norm_y2)
+        if self._bright_ready and cx2 > cx1 and cy2 > cy1:
+            c.tk.call(str(self._cut_photo), "copy", str(self._bright_photo), "-from", cx1, cy1, cx2, cy2, "-to", 0, 0, "-shrink")
+            c.coords(self._cut_item, cx1, cy1); c.itemconfigure(self._cut_item, state="normal")
+        else: c.itemconfigure(self._cut_item, state="hidden")
+        c.coords(self._box_item, norm_x1, norm_y1, norm_x2, norm_y2)
         width, height = norm_x2 - norm_x1, norm_y2 - norm_y1
         dim_text = f"{width} × {height}"
         text_y = norm_y1 - 20 if norm_y1 > 20 else norm_y2 + 5
-        text_bg = self._canvas.create_rectangle(norm_x1, text_y - 2, norm_x1 + len(dim_text)*7 + 10, text_y + 18, 
-                                     fill="black", outline="", tags="selection_elements")
-        text_id = self._canvas.create_text(norm_x1 + 5, text_y + 8, text=dim_text, fill="white", 
-                                anchor="w", font=("Segoe UI", 9), tags="selection_elements")
-            
+        c.coords(self._label_bg, norm_x1, text_y - 2, norm_x1 + len(dim_text)*7 + 10, text_y + 18)
+        c.coords(self._label_item, norm_x1 + 5, text_y + 8); c.itemconfigure(self._label_item, text=dim_text)
+        for item in (self._box_item, self._label_bg, self._label_item): c.itemconfigure(item, state="normal")
+
     def _show_action_panel(self):
-        self._canvas.delete("selection_elements")
+        self._state = State.CHOOSING
+        # The live items stay as the final frame: cut-out plus a solid box, without the size label
+        self._drag_frames.cancel(); self._draw_selection_box()
         x1, y1, x2, y2 = map(int, self._selection_bbox)
-        if x2-x1 > 0 and y2-y1 > 0:
-            highlight_crop = self._screenshot.crop((x1, y1, x2, y2))
-            self._highlight_photo = ImageTk.PhotoImage(highlight_crop)
-            self._canvas.create_image(x1, y1, image=self._highlight_photo, anchor="nw")
-        self._canvas.create_rectangle(x1, y1, x2, y2, outline="#00AAFF", width=1)
-        
+        self._canvas.itemconfigure(self._box_item, dash="")
+        self._canvas.itemconfigure(self._label_bg, state="hidden"); self._canvas.itemconfigure(self._label_item, state="hidden")
+
         self._magnifier.hide()
-        self._canvas.unbind("<Motion>"); self._canvas.unbind("<ButtonPress-1>")
-        self._canvas.unbind("<B1-Motion>"); self._canvas.unbind("<ButtonRelease-1>")
         self._canvas.config(cursor="")
-        
-        panel = tk.Frame(self._canvas, bg="#2D2D2D", highlightbackground="#555", highlightthickness=1)
-        
+
+        panel = self._panel = tk.Frame(self._canvas, bg="#2D2D2D", highlightbackground="#555", highlightthickness=1)
+
         # --- НОВОЕ: Карта действий с подсказками о горячих клавишах ---
         actions_map = [
             (SelectionAction.SAVE, "✓ Сохранить (Ctrl+S)"),
             (SelectionAction.COPY, "📋 Копировать (Ctrl+C)"),
             (SelectionAction.UPLOAD, "☁️ Загрузить"),
             (SelectionAction.SCAN_QR, "🔍 QR Скан (Ctrl+Q)"),
+            (SelectionAction.RECORD, "⏺ Запись (Ctrl+R)"),
             (SelectionAction.CANCEL, "❌ Отмена (Ctrl+Z)")
         ]
 
@@ -199,52 +334,52 @@ class SimpleSelection:
             if action == SelectionAction.UPLOAD and not self._settings.get("enable_catbox_upload"): continue
             btn = tk.Button(panel, text=text, bg="#3C3C3C", fg="white", activebackground="#007ACC",
                             activeforeground="white", relief="flat", font=("Segoe UI", 9),
-                            padx=10, pady=5, command=lambda a=action: self._finalize(self._selection_bbox, a))
+                            padx=10, pady=5, command=lambda a=action: self._choose(a))
             btn.pack(side="left", padx=4, pady=4)
 
         panel.update_idletasks()
         panel_y = y2 + 8
         if panel_y + panel.winfo_height() > self._root.winfo_height(): panel_y = y1 - panel.winfo_height() - 8
-        self._canvas.create_window(x1, panel_y, window=panel, anchor="nw")
-        
-        # --- НОВОЕ: Привязка горячих клавиш ---
-        self._bind_action_hotkeys()
-
-    # --- НОВОЕ: Метод для привязки горячих клавиш ---
-    def _bind_action_hotkeys(self):
-        """Binds hotkeys that are active only when the action panel is visible."""
-        self._root.bind("<Control-s>", lambda e: self._finalize(self._selection_bbox, SelectionAction.SAVE))
-        self._root.bind("<Control-c>", lambda e: self._finalize(self._selection_bbox, SelectionAction.COPY))
-        self._root.bind("<Control-q>", lambda e: self._finalize(self._selection_bbox, SelectionAction.SCAN_QR))
-        self._root.bind("<Control-z>", lambda e: self._finalize(None, SelectionAction.CANCEL))
+        self._canvas.create_window(x1, panel_y, window=panel, anchor="nw", tags="transient")
 
     def _finalize(self, bbox: Optional[list], action: SelectionAction):
-        image_to_process = None
+        if self._state in (State.INACTIVE, State.STARTING): return
+        image_to_process = None; region = None
         if bbox and action != SelectionAction.CANCEL:
             safe_bbox = ( max(0, int(bbox[0])), max(0, int(bbox[1])),
                           min(self._screenshot.width, int(bbox[2])), min(self._screenshot.height, int(bbox[3])) )
             if safe_bbox[2] > safe_bbox[0] and safe_bbox[3] > safe_bbox[1]:
                 image_to_process = self._screenshot.crop(safe_bbox)
-        
+                # The same area in virtual-desktop coordinates, for actions that capture it again (recording)
+                m = self._monitor; region = (m.x + safe_bbox[0], m.y + safe_bbox[1], m.x + safe_bbox[2], m.y + safe_bbox[3])
+
         action_str = action.name.lower()
         callback, image, act = self._on_complete, image_to_process, action_str
-        self._cleanup()
-        callback(image, act)
-        
-    def _cleanup(self):
-        if self._state == State.INACTIVE: return
-        self._state = State.INACTIVE
+        if action == SelectionAction.RECORD and region:
+            # Recording grabs the screen again: wait until the overlay is off it, or the first frames show it
+            self._cleanup(then=lambda: callback(image, act, region))
+        else:
+            self._cleanup(); callback(image, act, region)
 
-        # --- НОВОЕ: Отвязка горячих клавиш перед закрытием окна ---
+    def _cleanup(self, then: Optional[Callable[[], None]] = None):
+        """Hide the overlay for reuse; only this selection's items and data are dropped.
+        then runs once the overlay is really unmapped (see withdraw_then)."""
+        if self._state == State.INACTIVE:
+            if then: then()
+            return
+        self._state = State.INACTIVE
+        self._magnifier.release(); self._edges.cancel()
         if self._root and self._root.winfo_exists():
-            self._root.unbind("<Control-s>")
-            self._root.unbind("<Control-c>")
-            self._root.unbind("<Control-q>")
-            self._root.unbind("<Control-z>")
-        
-        if self._magnifier: self._magnifier.cleanup()
-        if self._root:
-            try: self._root.destroy()
-            except tk.TclError: pass
-        self._root = self._canvas = self._screenshot = self._magnifier = None
-        logger.info("Selection UI cleaned up.")
\ No newline at end of file
+            self._drag_frames.cancel()
+            if self._bright_job: self._root.after_cancel(self._bright_job)
+            self._canvas.itemconfigure("live", state="hidden"); self._canvas.itemconfigure(self._box_item, dash=(4,2))
+            self._canvas.delete("transient")
+            if self._panel: self._panel.destroy()
+            # Fullscreen is switched off while hidden so the next geometry() can move it to another monitor
+            self._root.attributes("-fullscreen", False)
+            if then: withdraw_then(self._root, then); then = None
+            else: self._root.withdraw()
+        self._panel = self._bright_job = None; self._bright_ready = False
+        self._screenshot = self._monitor = None
+        logger.info("Selection UI hidden.")
+        if then: then()
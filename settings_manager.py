@@ -14,6 +14,9 @@ IS_WINDOWS = sys.platform == "win32"
 if IS_WINDOWS:
     import winreg
 
+FORMAT_LABELS = {"png": "PNG", "webp": "WebP", "jpeg": "JPEG"}
+PROFILE_LABELS = {"fastest": "Быстрее", "balanced": "Баланс", "smallest": "Меньше"}
+
 # --- NEW WIDGET: A modern, animated Segmented Control for theme selection ---
 class SegmentedControl(tk.Frame):
     def __init__(self, parent, variable, options, theme_config, **kwargs):
@@ -131,7 +134,27 @@ class SettingsManager:
             "autostart": False,
             "start_minimized": True,
             "enable_catbox_upload": True,
-            "open_window_after_shot": True
+            "open_window_after_shot": True,
+            "prefetch_depth": 2,
+            "prefetch_memory_mb": 256,
+            "export_hardlinks": False,
+            "encoder_profile": "balanced",
+            "png_compress_level": 6,
+            "png_optimize": False,
+            "jpeg_quality": 90,
+            "capture_scope": "all",
+            "hotkey_burst": "ctrl+shift+print screen",
+            "burst_interval_ms": 500,
+            "burst_duration_s": 30,
+            "burst_buffer_frames": 20,
+            "burst_buffer_mb": 256,
+            "record_format": "apng",
+            "record_fps": 10,
+            "record_max_s": 300,
+            "snap_selection": True,
+            "upload_api_url": "https://catbox.moe/user/api.php",
+            "upload_workers": 2,
+            "upload_retries": 5
         }
         self.settings = self.load_settings()
 
@@ -153,7 +176,7 @@ class SettingsManager:
     def open_settings_window(self):
         win = tk.Toplevel(self.app.master)
         win.title("Настройки")
-        win.geometry("500x550")
+        win.geometry("500x685")
         win.resizable(False, False)
         win.transient(self.app.master)
         win.grab_set()
@@ -203,6 +226,17 @@ class SettingsManager:
         self.save_dir_entry.insert(0, self.settings["save_directory"]); self.save_dir_entry.pack(side='left', fill='x', expand=True, ipady=4)
         ttk.Button(dir_frame, text="...", command=self._browse_save_directory, width=3, style='Settings.TButton').pack(side='left', padx=(5,0))
 
+        lf_format = ttk.LabelFrame(tab_main, text="Формат файлов", style="Settings.TLabelframe", padding=10); lf_format.pack(pady=10, fill="x")
+        image_format = self.settings["image_format"].lower().replace("jpg", "jpeg")
+        self.image_format_var = tk.StringVar(value=FORMAT_LABELS.get(image_format, "PNG"))
+        SegmentedControl(lf_format, variable=self.image_format_var, options=FORMAT_LABELS.values(), theme_config=theme_cfg).pack(fill="x", padx=5, pady=(5, 8))
+        self.encoder_profile_var = tk.StringVar(value=PROFILE_LABELS.get(self.settings["encoder_profile"], PROFILE_LABELS["balanced"]))
+        SegmentedControl(lf_format, variable=self.encoder_profile_var, options=PROFILE_LABELS.values(), theme_config=theme_cfg).pack(fill="x", padx=5, pady=(0, 8))
+        quality_frame = ttk.Frame(lf_format, style='Settings.TFrame'); quality_frame.pack(fill='x', expand=True, padx=5)
+        ttk.Label(quality_frame, text="Качество JPEG:", style='Settings.TLabel', width=18).pack(side='left', padx=(0,10))
+        self.jpeg_quality_entry = ttk.Entry(quality_frame, style='Settings.TEntry')
+        self.jpeg_quality_entry.insert(0, str(self.settings["jpeg_quality"])); self.jpeg_quality_entry.pack(side='left', fill='x', expand=True, ipady=4)
+
         lf_system = ttk.LabelFrame(tab_main, text="Системные опции", style="Settings.TLabelframe", padding=10); lf_system.pack(pady=10, fill="x")
         
         self.autostart_var=tk.BooleanVar(value=self.settings.get("autostart", False))
@@ -214,6 +248,9 @@ class SettingsManager:
         self.hide_on_screenshot_var=tk.BooleanVar(value=self.settings.get("hide_on_screenshot", True))
         ttk.Checkbutton(lf_system,text="Скрывать окно при создании скриншота", var=self.hide_on_screenshot_var, style="Settings.TCheckbutton").pack(anchor="w", pady=2)
 
+        self.snap_selection_var = tk.BooleanVar(value=self.settings.get("snap_selection", True))
+        ttk.Checkbutton(lf_system, text="Прилипание выделения к краям элементов (Shift — отключить)", var=self.snap_selection_var, style="Settings.TCheckbutton").pack(anchor="w", pady=2)
+
         self.open_window_after_shot_var = tk.BooleanVar(value=self.settings.get("open_window_after_shot", True))
         ttk.Checkbutton(lf_system, text="Открывать окно после скриншота", var=self.open_window_after_shot_var, style="Settings.TCheckbutton").pack(anchor="w", pady=2)
         
@@ -225,6 +262,16 @@ class SettingsManager:
         # --- MODIFIED: The old radio buttons are replaced with our new widget ---
         self.theme_var = tk.StringVar(value=self.settings["theme"])
         SegmentedControl(lf_theme, variable=self.theme_var, options=THEMES.keys(), theme_config=theme_cfg).pack(fill="x", padx=5, pady=5)
+
+        lf_prefetch = ttk.LabelFrame(tab_ui, text="Предзагрузка превью", style="Settings.TLabelframe", padding=10); lf_prefetch.pack(pady=10, fill="x")
+        depth_frame = ttk.Frame(lf_prefetch, style='Settings.TFrame'); depth_frame.pack(fill='x', expand=True, padx=5, pady=5)
+        ttk.Label(depth_frame, text="Соседних файлов:", style='Settings.TLabel', width=18).pack(side='left', padx=(0,10))
+        self.prefetch_depth_entry = ttk.Entry(depth_frame, style='Settings.TEntry')
+        self.prefetch_depth_entry.insert(0, str(self.settings["prefetch_depth"])); self.prefetch_depth_entry.pack(side='left', fill='x', expand=True, ipady=4)
+        memory_frame = ttk.Frame(lf_prefetch, style='Settings.TFrame'); memory_frame.pack(fill='x', expand=True, padx=5, pady=(5,10))
+        ttk.Label(memory_frame, text="Память, МБ:", style='Settings.TLabel', width=18).pack(side='left', padx=(0,10))
+        self.prefetch_memory_entry = ttk.Entry(memory_frame, style='Settings.TEntry')
+        self.prefetch_memory_entry.insert(0, str(self.settings["prefetch_memory_mb"])); self.prefetch_memory_entry.pack(side='left', fill='x', expand=True, ipady=4)
         
         lf_hk = ttk.LabelFrame(tab_hotkeys, text="Назначение клавиш", style="Settings.TLabelframe", padding=10); lf_hk.pack(pady=10, fill="x")
         hk_full_frame = ttk.Frame(lf_hk, style='Settings.TFrame'); hk_full_frame.pack(fill='x', expand=True, padx=5, pady=5)
@@ -235,6 +282,14 @@ class SettingsManager:
         ttk.Label(hk_area_frame, text="Выделение области:", style='Settings.TLabel', width=18).pack(side='left', padx=(0,10))
         self.hotkey_select_area_entry = ttk.Entry(hk_area_frame, style='Settings.TEntry')
         self.hotkey_select_area_entry.insert(0, self.settings["hotkey_select_area"]); self.hotkey_select_area_entry.pack(side='left', fill='x', expand=True, ipady=4)
+
+        lf_burst = ttk.LabelFrame(tab_hotkeys, text="Серия скриншотов", style="Settings.TLabelframe", padding=10); lf_burst.pack(pady=10, fill="x")
+        self.burst_entries = {}
+        for key, text in (("hotkey_burst", "Старт / стоп:"), ("burst_interval_ms", "Интервал, мс:"), ("burst_duration_s", "Длительность, с:")):
+            row = ttk.Frame(lf_burst, style='Settings.TFrame'); row.pack(fill='x', expand=True, padx=5, pady=5)
+            ttk.Label(row, text=text, style='Settings.TLabel', width=18).pack(side='left', padx=(0,10))
+            entry = ttk.Entry(row, style='Settings.TEntry'); entry.insert(0, str(self.settings[key])); entry.pack(side='left', fill='x', expand=True, ipady=4)
+            self.burst_entries[key] = entry
         
         btn_frame = ttk.Frame(win, style='Settings.TFrame'); btn_frame.pack(side="bottom", pady=15)
         ttk.Button(btn_frame, text="Сохранить", command=lambda: self._save_and_close(win), style='Settings.TButton', width=12).pack(side="left", padx=5)
@@ -257,19 +312,29 @@ class SettingsManager:
     def _save_and_close(self, window):
         new_theme = self.theme_var.get()
         self.settings.update({
-            "save_directory": self.save_dir_entry.get(),
+            "save_directory": self.save_dir_entry.get().strip() or self.settings["save_directory"],
             "theme": new_theme,
             "hide_on_screenshot": self.hide_on_screenshot_var.get(),
+            "snap_selection": self.snap_selection_var.get(),
             "hotkey_full_screen": self.hotkey_full_screen_entry.get().lower(),
             "hotkey_select_area": self.hotkey_select_area_entry.get().lower(),
             "autostart": self.autostart_var.get(),
             "start_minimized": self.start_minimized_var.get(),
             "enable_catbox_upload": self.enable_catbox_upload_var.get(),
-            "open_window_after_shot": self.open_window_after_shot_var.get()
+            "open_window_after_shot": self.open_window_after_shot_var.get(),
+            "prefetch_depth": self._int_from_entry(self.prefetch_depth_entry, "prefetch_depth"),
+            "prefetch_memory_mb": self._int_from_entry(self.prefetch_memory_entry, "prefetch_memory_mb"),
+            "image_format": next((k for k, v in FORMAT_LABELS.items() if v == self.image_format_var.get()), "png"),
+            "encoder_profile": next((k for k, v in PROFILE_LABELS.items() if v == self.encoder_profile_var.get()), "balanced"),
+            "jpeg_quality": min(100, max(1, self._int_from_entry(self.jpeg_quality_entry, "jpeg_quality"))),
+            "hotkey_burst": self.burst_entries["hotkey_burst"].get().lower(),
+            "burst_interval_ms": max(20, self._int_from_entry(self.burst_entries["burst_interval_ms"], "burst_interval_ms")),
+            "burst_duration_s": max(1, self._int_from_entry(self.burst_entries["burst_duration_s"], "burst_duration_s"))
         })
         
         if IS_WINDOWS: self.manage_autostart()
         self.save_settings()
+        self.app.screenshot_dir = self.settings["save_directory"]  # load_screenshots ниже переключит библиотеку на новую папку
         
         if self.app.theme_name != new_theme:
             self.app.theme_name = new_theme
@@ -279,10 +344,16 @@ class SettingsManager:
              # Partial rebuild needed if only settings changed
              self.app.setup_ui() 
 
-        self.app.load_screenshots()
+        self.app.load_screenshots(rescan=False) # setup_ui recreated the tree; repopulate it from the library snapshot
         self.app.rehook_hotkeys()
+        self.app.apply_runtime_settings()
         
         window.destroy()
+
+    def _int_from_entry(self, entry, key):
+        """Non-negative integer from entry, the current value of key if the text is not a number"""
+        try: return max(0, int(entry.get().strip()))
+        except ValueError: return self.settings[key]
         
     def manage_autostart(self):
         if not IS_WINDOWS: return
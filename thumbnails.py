@@ -0,0 +1,213 @@
+# thumbnails.py
+import os
+import sys
+import time
+import hashlib
+import threading
+from collections import deque
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+IS_WINDOWS = sys.platform == "win32"
+
+THUMBNAIL_SIZE = (40, 40)
+CACHE_DIR_NAME = ".cappyfox_thumbs"
+# In-memory PhotoImage budget: ~2600 thumbnails, far more than one screen of rows
+THUMBNAIL_CACHE_BUDGET = 16 * 1024 * 1024
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.gif')
+
+
+# Coarse stages stop at this multiple of the target size; the final high-quality
+# filter only sees an image 2-3x bigger than the thumbnail.
+REDUCE_HEADROOM = 2
+
+
+def decode_reduced(path: str, target: Tuple[int, int], final_filter=Image.Resampling.LANCZOS) -> Image.Image:
+    """Decode path at reduced resolution and fit it into target.
+
+    draft() lets libjpeg decode JPEGs at 1/2..1/8 scale directly; thumbnail()
+    with reducing_gap shrinks the rest with a cheap integer reduce first and
+    only uses final_filter for the last REDUCE_HEADROOM x.
+    """
+    with Image.open(path) as img:
+        img.draft("RGB" if img.mode not in ("L", "RGB") else img.mode, (target[0] * REDUCE_HEADROOM, target[1] * REDUCE_HEADROOM))
+        if img.mode in ("P", "1", "LA", "PA", "I;16"): img = img.convert("RGBA")
+        img.thumbnail(target, final_filter, reducing_gap=float(REDUCE_HEADROOM))  # in place
+        img.load()  # thumbnail() leaves an image already small enough unloaded, and the file closes here
+    return img
+
+
+class ThumbnailStore:
+    """Persistent on-disk thumbnail cache that lives next to the screenshot library.
+
+    Entries are keyed by file name, mtime and size, so an edited or replaced
+    file simply misses the cache and stale entries are dropped by prune().
+    """
+    def __init__(self, library_dir: str, size: Tuple[int, int] = THUMBNAIL_SIZE):
+        self.library_dir = library_dir
+        self.size = size
+        self.cache_dir = os.path.join(library_dir, CACHE_DIR_NAME)
+        self._lock = threading.Lock()
+        self._dir_ready = False
+
+    def key_for(self, path: str, mtime_ns: int, size: int) -> str:
+        """Cache key for a file: changes whenever the file's mtime or size changes"""
+        raw = f"{os.path.basename(path)}|{mtime_ns}|{size}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _ensure_dir(self):
+        with self._lock:
+            if self._dir_ready: return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if IS_WINDOWS:
+                try:
+                    import ctypes
+                    ctypes.windll.kernel32.SetFileAttributesW(self.cache_dir, 0x02)  # FILE_ATTRIBUTE_HIDDEN
+                except Exception: pass
+            self._dir_ready = True
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """Return the cached thumbnail for key, or None on a miss"""
+        try:
+            with Image.open(self._entry_path(key)) as img:
+                img.load()
+                return img.copy()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, thumb: Image.Image):
+        """Write a thumbnail atomically so a crash never leaves a half-written entry"""
+        self._ensure_dir()
+        target = self._entry_path(key)
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        try:
+            thumb.save(tmp, "PNG")
+            os.replace(tmp, target)
+        except OSError as e:
+            print(f"Failed to store thumbnail {key}: {e}")
+            try: os.remove(tmp)
+            except OSError: pass
+
+    def load(self, path: str, mtime_ns: int, size: int) -> Tuple[str, Image.Image]:
+        """Return (key, thumbnail) for path, decoding the source image only on a cache miss"""
+        key = self.key_for(path, mtime_ns, size)
+        thumb = self.get(key)
+        if thumb is None:
+            thumb = self.create(path)
+            self.put(key, thumb)
+        return key, thumb
+
+    def create(self, path: str) -> Image.Image:
+        """Decode path and downscale it to the thumbnail size"""
+        thumb = decode_reduced(path, self.size)
+        return thumb.convert("RGBA") if thumb.mode not in ("RGB", "RGBA") else thumb
+
+    def discard(self, key: str):
+        try: os.remove(self._entry_path(key))
+        except OSError: pass
+
+    def prune(self, live_keys: Iterable[str]) -> int:
+        """Delete entries whose source file no longer exists or has changed"""
+        live = {f"{k}.png" for k in live_keys}
+        removed = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            if name in live or name.endswith(".tmp"): continue
+            try:
+                os.remove(os.path.join(self.cache_dir, name)); removed += 1
+            except OSError: pass
+        return removed
+
+
+class ThumbnailLoader:
+    """Bounded pool of worker threads that decodes thumbnails off the Tk thread.
+
+    request() replaces whatever is still queued with the rows the list needs
+    right now (visible rows first); cancel() also drops results of work that
+    is already running. Results are handed to on_ready(item_id, key, image)
+    on the Tk thread via master.after, in small time-budgeted batches.
+    """
+    PUMP_INTERVAL_MS = 15
+    PUMP_BUDGET_S = 0.008
+
+    def __init__(self, master, store: ThumbnailStore, on_ready: Callable[[str, str, Image.Image], None],
+                 workers: Optional[int] = None):
+        self.master = master
+        self.store = store
+        self.on_ready = on_ready
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending = {}
+        self._queue: deque = deque()
+        self._in_flight = 0
+        self._results: deque = deque()
+        self._pump_id = None
+        for _ in range(workers or min(4, os.cpu_count() or 1)):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def request(self, jobs: List[Tuple[str, str, int, int]]):
+        """Replace queued work with jobs, a list of (item_id, path, mtime_ns, size) in priority order"""
+        with self._cond:
+            self._pending = {item_id: job for item_id, *job in jobs}
+            self._queue = deque(self._pending)
+            if jobs: self._cond.notify_all()
+        if jobs: self._schedule_pump()
+
+    def discard(self, item_ids: Iterable[str]):
+        """Drop queued jobs for rows that no longer exist"""
+        with self._cond:
+            for item_id in item_ids: self._pending.pop(item_id, None)
+
+    def cancel(self):
+        with self._cond:
+            self._generation += 1
+            self._pending = {}; self._queue.clear()
+            self._results.clear()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending or self._in_flight or self._results)
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while self._queue:
+                    item_id = self._queue.popleft()
+                    job = self._pending.pop(item_id, None)
+                    if job:
+                        self._in_flight += 1
+                        return self._generation, item_id, job
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            generation, item_id, (path, mtime_ns, size) = self._next_job()
+            try:
+                key, thumb = self.store.load(path, mtime_ns, size)
+                if generation == self._generation: self._results.append((generation, item_id, key, thumb))
+            except Exception as e:
+                print(f"Thumbnail creation failed for {path}: {e}")
+            finally:
+                with self._cond: self._in_flight -= 1
+
+    def _schedule_pump(self):
+        if self._pump_id is None:
+            self._pump_id = self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+
+    def _pump(self):
+        """Runs on the Tk thread: apply finished thumbnails within a small time budget"""
+        self._pump_id = None
+        deadline = time.perf_counter() + self.PUMP_BUDGET_S
+        while self._results and time.perf_counter() < deadline:
+            generation, item_id, key, thumb = self._results.popleft()
+            if generation != self._generation: continue
+            try: self.on_ready(item_id, key, thumb)
+            except Exception as e: print(f"Failed to apply thumbnail: {e}")
+        if self.busy: self._schedule_pump()
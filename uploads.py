@@ -0,0 +1,225 @@
+# uploads.py
+import io
+import os
+import json
+import uuid
+import random
+import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+
+CATBOX_API_URL = "https://catbox.moe/user/api.php"
+
+
+class UploadError(Exception):
+    """Failed upload. Transient errors (network, timeouts, 5xx, 429) are worth retrying, others are not."""
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class UploadJob(NamedTuple):
+    id: str
+    path: str      # file whose bytes are sent
+    filename: str  # name the server sees
+    spooled: bool  # path is our own copy in the spool directory, removed once the job is over
+    created: str
+
+
+class MultipartFile:
+    """multipart/form-data body holding one file, read in chunks while it is sent.
+
+    requests' files= builds the whole body in memory, one more copy of the
+    file. This streams the file from disk, or wraps an in-memory buffer
+    without copying it, and knows its length up front, so the request goes
+    out with a Content-Length rather than chunked encoding.
+    """
+    def __init__(self, fields: Dict[str, str], name: str, filename: str, source: Union[str, bytes]):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        filename = filename.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+        head = "".join(f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n' for k, v in fields.items())
+        head += f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+        head_bytes, tail_bytes = head.encode(), f"\r\n--{boundary}--\r\n".encode()
+        if isinstance(source, str): body = open(source, "rb"); size = os.fstat(body.fileno()).st_size
+        else: body = io.BytesIO(source); size = len(source)  # BytesIO(bytes) shares the buffer, no copy
+        self._segments = deque([io.BytesIO(head_bytes), body, io.BytesIO(tail_bytes)])
+        self._length = len(head_bytes) + size + len(tail_bytes)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._segments and size != 0:
+            chunk = self._segments[0].read(size)
+            if not chunk: self._segments.popleft().close(); continue
+            chunks.append(chunk)
+            if size > 0: size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self):
+        while self._segments: self._segments.popleft().close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+class UploadManager:
+    """Upload queue for catbox.moe, or any server taking the same form fields at api_url.
+
+    All uploads share one requests.Session, so TCP and TLS connections are
+    kept alive and reused, and at most `workers` uploads run at a time.
+    Transient failures are retried with exponential backoff and jitter up to
+    max_attempts; permanent ones fail at once. Queued jobs are recorded in
+    queue_file and fresh captures are written to spool_dir before upload, so
+    whatever was still queued or ran out of retries is picked up again by
+    resume() on the next start. on_done(job, url) and on_error(job, exc) run
+    on the Tk thread.
+    """
+    PUMP_INTERVAL_MS = 100
+
+    def __init__(self, master, on_done: Callable[[UploadJob, str], None], on_error: Callable[[UploadJob, Exception], None],
+                 api_url: str = CATBOX_API_URL, queue_file: str = "upload_queue.json", spool_dir: str = "upload_spool",
+                 workers: int = 2, max_attempts: int = 5, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 timeout: Tuple[float, float] = (5, 60)):
+        self.master = master
+        self.on_done = on_done
+        self.on_error = on_error
+        self.api_url = api_url
+        self.queue_file = queue_file
+        self.spool_dir = spool_dir
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter); self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, UploadJob] = {}    # queued or running
+        self._parked: Dict[str, UploadJob] = {}  # out of retries, kept for the next resume(); both go to queue_file
+        self._closing = threading.Event()
+        self._results: deque = deque()
+        self._pump_id = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def upload_image(self, image: Image.Image, filename: str = "screenshot.png") -> UploadJob:
+        """Queue a fresh capture, which has no file yet: it is encoded to PNG in
+        memory on a worker and sent from there, with a copy in the spool
+        directory for resume()"""
+        job_id = uuid.uuid4().hex
+        job = UploadJob(job_id, os.path.join(self.spool_dir, job_id + ".png"), filename, True, datetime.datetime.now().isoformat())
+        return self._submit(job, image)
+
+    def upload_file(self, path: str) -> UploadJob:
+        """Queue an existing file; its bytes are streamed as they are, never decoded or re-encoded"""
+        job = UploadJob(uuid.uuid4().hex, os.path.abspath(path), os.path.basename(path), False, datetime.datetime.now().isoformat())
+        return self._submit(job)
+
+    def resume(self) -> int:
+        """Re-queue the jobs left in queue_file by an earlier run; returns how many"""
+        try:
+            with open(self.queue_file, "r", encoding="utf-8") as f: saved = json.load(f)
+        except (OSError, ValueError): return 0
+        jobs = []
+        for data in saved if isinstance(saved, list) else []:
+            try: job = UploadJob(**data)
+            except TypeError: continue
+            if job.id not in self._jobs and os.path.exists(job.path): jobs.append(job)
+        for job in jobs: self._submit(job)
+        if not jobs: self._persist()
+        return len(jobs)
+
+    def close(self):
+        """Stop retrying and starting uploads; unfinished jobs stay in queue_file for resume()"""
+        self._closing.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, job: UploadJob, image: Optional[Image.Image] = None) -> UploadJob:
+        with self._lock: self._parked.pop(job.id, None); self._jobs[job.id] = job
+        self._persist()
+        self._executor.submit(self._run, job, image)
+        self._schedule_pump()
+        return job
+
+    def _persist(self):
+        with self._lock:
+            data = [job._asdict() for job in (*self._jobs.values(), *self._parked.values())]
+            tmp = self.queue_file + ".tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp, self.queue_file)
+            except OSError as e: print(f"Failed to save upload queue: {e}")
+
+    def _finish(self, job: UploadJob, park: bool = False):
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            if park: self._parked[job.id] = job
+        self._persist()
+        if job.spooled and not park:
+            try: os.remove(job.path)
+            except OSError: pass
+
+    def _run(self, job: UploadJob, image: Optional[Image.Image]):
+        try:
+            data = None
+            if image is not None:
+                with io.BytesIO() as buffer: image.save(buffer, "PNG"); data = buffer.getvalue()
+                os.makedirs(self.spool_dir, exist_ok=True)
+                with open(job.path + ".part", "wb") as f: f.write(data)
+                os.replace(job.path + ".part", job.path)
+            url = self._upload_with_retry(job, data)
+        except Exception as e:
+            self._results.append((job, None, e))
+            # Out of retries on a transient error: keep the job for the next start
+            self._finish(job, park=isinstance(e, UploadError) and e.transient)
+        else:
+            self._results.append((job, url, None)); self._finish(job)
+
+    def _upload_with_retry(self, job: UploadJob, data: Optional[bytes] = None) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            if self._closing.is_set(): raise UploadError("upload interrupted by exit", transient=True)
+            try: return self._post(job, data)
+            except UploadError as e:
+                if not e.transient or attempt == self.max_attempts: raise
+                print(f"Upload of {job.filename} failed ({e}), retry {attempt} of {self.max_attempts - 1}")
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            self._closing.wait(delay)
+        raise AssertionError("unreachable")
+
+    def _post(self, job: UploadJob, data: Optional[bytes] = None) -> str:
+        try:
+            with MultipartFile({"reqtype": "fileupload"}, "fileToUpload", job.filename, job.path if data is None else data) as body:
+                r = self.session.post(self.api_url, data=body, headers={"Content-Type": body.content_type}, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise UploadError(str(e), transient=True) from e
+        if r.status_code == 429 or r.status_code >= 500: raise UploadError(f"HTTP {r.status_code}", transient=True)
+        if r.status_code >= 400: raise UploadError(f"HTTP {r.status_code}: {r.text[:200]}")
+        text = r.text.strip()
+        if not text.startswith("http"): raise UploadError(f"API error: {text[:200]}")
+        return text
+
+    def _schedule_pump(self):
+        if self._pump_id is None and self.master is not None:
+            self._pump_id = self.master.after(self.PUMP_INTERVAL_MS, self._pump)
+
+    def _pump(self):
+        self._pump_id = None
+        while self._results:
+            job, url, error = self._results.popleft()
+            try:
+                if error is None: self.on_done(job, url)
+                else: self.on_error(job, error)
+            except Exception as e: print(f"Failed to report upload {job.filename}: {e}")
+        if self._jobs or self._results: self._schedule_pump()